@@ -2,7 +2,7 @@
 import logging
 from datetime import datetime, timezone
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, status, Query, Request
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, BackgroundTasks
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -27,6 +27,7 @@ router = APIRouter()
 @router.post("/auth/request-magic-link", response_model=MagicLinkResponse)
 async def request_magic_link(
     request: MagicLinkRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -97,17 +98,8 @@ async def request_magic_link(
         db.add(magic_token)
         db.commit()
         
-        # Send magic link email
-        email_sent = email_service.send_magic_link(
-            email=request.email,
-            name=user.name,
-            token=token
-        )
-        
-        if not email_sent:
-            logger.error(f"Failed to send magic link email to {request.email}")
-            # Don't fail the request - token is still valid
-            # User can still use the token if they get it through logs in dev mode
+        # Send magic link email after the response goes out (runs in the threadpool)
+        background_tasks.add_task(send_magic_link_email, request.email, user.name, token)
         
         logger.info(f"Magic link requested for user: {request.email}")
         
@@ -128,6 +120,15 @@ async def request_magic_link(
             detail="Internal server error"
         )
 
+def send_magic_link_email(email: str, name: Optional[str], token: str):
+    """Send the magic link email, logging failures"""
+    email_sent = email_service.send_magic_link(email=email, name=name, token=token)
+    
+    if not email_sent:
+        logger.error(f"Failed to send magic link email to {email}")
+        # Don't fail the request - token is still valid
+        # User can still use the token if they get it through logs in dev mode
+
 @router.get("/auth/verify")
 async def verify_magic_link_redirect(
     token: str = Query(..., description="Magic link token"),
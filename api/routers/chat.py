@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 import requests
+from requests.adapters import HTTPAdapter
+import orjson
 import os
 import re
 import time
@@ -27,6 +29,19 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
+TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
+TOGETHER_MODEL = "mistralai/Mistral-7B-Instruct-v0.1"
+TOGETHER_HEADERS = {
+    "Authorization": f"Bearer {TOGETHER_API_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Static parts of each Together.ai request; callers add the messages
+CLASSIFY_REQUEST_TEMPLATE = {"model": TOGETHER_MODEL, "temperature": 0.1, "max_tokens": 5}
+CHAT_REQUEST_TEMPLATE = {"model": TOGETHER_MODEL, "temperature": 0.3, "max_tokens": 1000}
+QUICK_REQUEST_TEMPLATE = {"model": TOGETHER_MODEL, "temperature": 0.3, "max_tokens": 500}  # Shorter responses for quick queries
+ANALYSIS_REQUEST_TEMPLATE = {"model": TOGETHER_MODEL, "temperature": 0.3, "max_tokens": 1500}
+
 NHTSA_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVinValuesExtended/{vin}?format=json"
 
 # In-memory cache for classification results
@@ -34,44 +49,50 @@ classification_cache = {}
 CACHE_MAX_SIZE = 10000
 CACHE_TTL = 3600  # 1 hour
 
+# Shared HTTP session so Together.ai calls reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# Keyword lists for instant classification
+HIGH_CONFIDENCE_AUTOMOTIVE_TERMS = (
+    "check engine", "trouble code", "dtc", "obd2", "diagnostic", "engine", "transmission",
+    "brake", "coolant", "alternator", "starter", "battery", "airbag", "abs", "ecu",
+    "vehicle", "car", "truck", "automotive", "mechanic", "repair", "maintenance"
+)
+
+NON_AUTOMOTIVE_TERMS = (
+    "weather", "cooking", "recipe", "sports", "politics", "news", "music", "movie",
+    "tv show", "celebrity", "fashion", "travel", "hotel", "restaurant", "food",
+    "programming", "software", "computer", "phone", "social media", "dating",
+    "relationship", "health", "medicine", "doctor", "hospital", "school", "education"
+)
+
+# Precompiled matchers so each question is scanned once per check
+DTC_CODE_RE = re.compile(r'\b[PBCU][0-9A-F]{4}\b', re.IGNORECASE)
+DTC_PREFIX_RE = re.compile(r'[PBCU][0-3]', re.IGNORECASE)
+AUTOMOTIVE_TERMS_RE = re.compile("|".join(map(re.escape, HIGH_CONFIDENCE_AUTOMOTIVE_TERMS)), re.IGNORECASE)
+NON_AUTOMOTIVE_TERMS_RE = re.compile("|".join(map(re.escape, NON_AUTOMOTIVE_TERMS)), re.IGNORECASE)
+
 def instant_classification(question: str) -> Optional[Tuple[bool, str]]:
     """
     Tier 1: Instant classification for obvious cases
     Returns (is_automotive, reason) or None if needs further classification
     """
-    question_lower = question.lower()
-    question_upper = question.upper()
-    
     # High confidence automotive cases
     # DTC codes - definitely automotive
-    dtc_pattern = r'\b[PBCU][0-9A-F]{4}\b'
-    if re.search(dtc_pattern, question_upper):
+    if DTC_CODE_RE.search(question):
         return True, "dtc_code_detected"
     
-    # DTC prefixes
-    dtc_prefixes = ["P0", "P1", "P2", "P3", "B0", "B1", "B2", "B3", "C0", "C1", "C2", "C3", "U0", "U1", "U2", "U3"]
-    if any(prefix in question_upper for prefix in dtc_prefixes):
+    # DTC prefixes (P0-P3, B0-B3, C0-C3, U0-U3)
+    if DTC_PREFIX_RE.search(question):
         return True, "dtc_prefix_detected"
     
     # Obvious automotive terms
-    high_confidence_automotive = [
-        "check engine", "trouble code", "dtc", "obd2", "diagnostic", "engine", "transmission",
-        "brake", "coolant", "alternator", "starter", "battery", "airbag", "abs", "ecu",
-        "vehicle", "car", "truck", "automotive", "mechanic", "repair", "maintenance"
-    ]
-    
-    if any(term in question_lower for term in high_confidence_automotive):
+    if AUTOMOTIVE_TERMS_RE.search(question):
         return True, "automotive_keyword_detected"
     
     # High confidence non-automotive cases
-    non_automotive = [
-        "weather", "cooking", "recipe", "sports", "politics", "news", "music", "movie",
-        "tv show", "celebrity", "fashion", "travel", "hotel", "restaurant", "food",
-        "programming", "software", "computer", "phone", "social media", "dating",
-        "relationship", "health", "medicine", "doctor", "hospital", "school", "education"
-    ]
-    
-    if any(term in question_lower for term in non_automotive):
+    if NON_AUTOMOTIVE_TERMS_RE.search(question):
         return False, "non_automotive_keyword_detected"
     
     # If question is very short and ambiguous, require context
@@ -99,22 +120,15 @@ Examples:
 Question: {question}"""
 
     try:
-        response = requests.post(
-            "https://api.together.xyz/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {TOGETHER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "mistralai/Mistral-7B-Instruct-v0.1",
-                "messages": [
-                    {"role": "user", "content": classification_prompt}
-                ],
-                "temperature": 0.1,
-                "max_tokens": 5
-            }
+        response = _SESSION.post(
+            TOGETHER_URL,
+            headers=TOGETHER_HEADERS,
+            data=orjson.dumps({
+                **CLASSIFY_REQUEST_TEMPLATE,
+                "messages": [{"role": "user", "content": classification_prompt}]
+            })
         )
-        result = response.json()["choices"][0]["message"]["content"].strip()
+        result = orjson.loads(response.content)["choices"][0]["message"]["content"].strip()
         return result.upper() == "YES"
     except Exception as e:
         logger.error(f"LLM classification failed: {e}")
@@ -233,23 +247,12 @@ def get_vehicle_info_from_vin(vin: str) -> Dict[str, str]:
     except Exception:
         return {}
 
-def generate_enhanced_system_prompt(context: DiagnosticContext = None) -> str:
-    """Generate system prompt with diagnostic context"""
-    base_prompt = """You are a master mechanic with decades of experience working on all types of vehicles. You ONLY answer mechanical and automotive questions.
+# Static prompt fragments, built once at import
+MECHANIC_BASE_PROMPT = """You are a master mechanic with decades of experience working on all types of vehicles. You ONLY answer mechanical and automotive questions.
 
 Provide clear, helpful explanations that are informative yet accessible. Explain technical terms when needed, focus on practical steps, and always prioritize safety by recommending professional help for complex or dangerous tasks."""
 
-    if context:
-        diagnostic_info = format_diagnostic_context(context)
-        if diagnostic_info:
-            base_prompt += f"""
-
-CURRENT DIAGNOSTIC CONTEXT:
-{diagnostic_info}
-
-Use this specific diagnostic information to provide targeted advice for this exact vehicle and situation."""
-
-    format_instructions = """
+MECHANIC_FORMAT_INSTRUCTIONS = """
 
 Always structure your responses in proper markdown format:
 
@@ -274,7 +277,25 @@ Always structure your responses in proper markdown format:
 
 Use proper markdown formatting with headers, lists, and emphasis."""
 
-    return base_prompt + format_instructions
+# System prompt used when there is no diagnostic context to inject
+MECHANIC_SYSTEM_PROMPT = MECHANIC_BASE_PROMPT + MECHANIC_FORMAT_INSTRUCTIONS
+
+QUICK_SYSTEM_PROMPT = """You are a helpful automotive assistant. Provide clear, concise answers to car-related questions. Keep responses brief but informative. Use simple language and focus on practical advice."""
+
+ANALYSIS_SYSTEM_PROMPT = "You are a master automotive technician providing detailed vehicle diagnostics analysis."
+
+def generate_enhanced_system_prompt(context: DiagnosticContext = None) -> str:
+    """Generate system prompt with diagnostic context"""
+    diagnostic_info = format_diagnostic_context(context) if context else ""
+    if not diagnostic_info:
+        return MECHANIC_SYSTEM_PROMPT
+
+    return f"""{MECHANIC_BASE_PROMPT}
+
+CURRENT DIAGNOSTIC CONTEXT:
+{diagnostic_info}
+
+Use this specific diagnostic information to provide targeted advice for this exact vehicle and situation.{MECHANIC_FORMAT_INSTRUCTIONS}"""
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_context(request: ChatRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -359,24 +380,19 @@ Please ask me questions related to car repairs, diagnostics, or vehicle maintena
         user_prompt = f"Question: {request.message}"
         
         # Call LLM
-        llm_response = requests.post(
-            "https://api.together.xyz/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {TOGETHER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "mistralai/Mistral-7B-Instruct-v0.1",
+        llm_response = _SESSION.post(
+            TOGETHER_URL,
+            headers=TOGETHER_HEADERS,
+            data=orjson.dumps({
+                **CHAT_REQUEST_TEMPLATE,
                 "messages": [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 1000
-            }
+                ]
+            })
         )
 
-        result = llm_response.json()
+        result = orjson.loads(llm_response.content)
         answer = result["choices"][0]["message"]["content"]
 
         # Create response message
@@ -495,7 +511,7 @@ async def quick_chat(request: ChatRequest, db: Session = Depends(get_db), curren
                 enhanced_context.vehicle_info = vehicle_info
 
         # Simple system prompt for quick responses
-        system_prompt = """You are a helpful automotive assistant. Provide clear, concise answers to car-related questions. Keep responses brief but informative. Use simple language and focus on practical advice."""
+        system_prompt = QUICK_SYSTEM_PROMPT
         
         if enhanced_context:
             diagnostic_info = format_diagnostic_context(enhanced_context)
@@ -506,24 +522,19 @@ async def quick_chat(request: ChatRequest, db: Session = Depends(get_db), curren
         user_prompt = f"Quick question: {request.message}"
         
         # Call LLM with shorter max tokens for quick responses
-        llm_response = requests.post(
-            "https://api.together.xyz/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {TOGETHER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "mistralai/Mistral-7B-Instruct-v0.1",
+        llm_response = _SESSION.post(
+            TOGETHER_URL,
+            headers=TOGETHER_HEADERS,
+            data=orjson.dumps({
+                **QUICK_REQUEST_TEMPLATE,
                 "messages": [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 500  # Shorter responses for quick queries
-            }
+                ]
+            })
         )
 
-        result = llm_response.json()
+        result = orjson.loads(llm_response.content)
         answer = result["choices"][0]["message"]["content"]
 
         # Create response message
@@ -613,24 +624,19 @@ Format your response in markdown with clear sections and actionable advice."""
                 "status": "success"
             }
         
-        llm_response = requests.post(
-            "https://api.together.xyz/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {TOGETHER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "mistralai/Mistral-7B-Instruct-v0.1",
+        llm_response = _SESSION.post(
+            TOGETHER_URL,
+            headers=TOGETHER_HEADERS,
+            data=orjson.dumps({
+                **ANALYSIS_REQUEST_TEMPLATE,
                 "messages": [
-                    {"role": "system", "content": "You are a master automotive technician providing detailed vehicle diagnostics analysis."},
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                     {"role": "user", "content": analysis_prompt}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 1500
-            }
+                ]
+            })
         )
         
-        result = llm_response.json()
+        result = orjson.loads(llm_response.content)
         ai_analysis = result["choices"][0]["message"]["content"]
         
         return {
@@ -7,7 +7,7 @@ from api.schemas.diagnostics import (
     DiagnosticsResponse,
     CodeInfo,
 )
-from api.utils.dtc import get_code_description
+from api.utils.dtc import get_code_descriptions
 
 router = APIRouter()
 
@@ -36,6 +36,7 @@ def diagnose(payload: DiagnosticsRequest):
     }
 
     decoded = [
-        CodeInfo(code=c, description=get_code_description(c)) for c in payload.codes
+        CodeInfo(code=c, description=d)
+        for c, d in zip(payload.codes, get_code_descriptions(payload.codes))
     ]
     return DiagnosticsResponse(vin_info=vin_info, codes=decoded)
@@ -1,11 +1,10 @@
 # api/routers/scanner.py
 import logging
-import time
 from datetime import datetime
 from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException, status, BackgroundTasks, Query
 from api.utils.elm327 import ELM327Scanner
-from api.utils.dtc import get_code_description, categorize_dtc, get_dtc_severity
+from api.utils.dtc import get_code_description, get_code_descriptions, categorize_dtc, categorize_dtcs, get_dtc_severity
 from api.schemas.scanner import (
     ScannerConnectRequest,
     ScannerConnectResponse,
@@ -25,6 +24,7 @@ from api.schemas.scanner import (
     DTCCode,
     DTCListResponse,
     VehicleHealthResponse,
+    HealthStatus,
     ScannerStatusFlutterResponse,
     FullDiagnosticScanRequest,
     FullDiagnosticScanResponse,
@@ -60,7 +60,7 @@ live_data_cache: Dict[str, Any] = {
 async def list_available_ports():
     """List available serial ports for OBD2 scanners"""
     try:
-        ports = scanner.list_available_ports()
+        ports = await scanner.list_available_ports()
         return ports
     except Exception as e:
         logger.error(f"Error listing ports: {e}")
@@ -74,14 +74,14 @@ async def connect_scanner(request: ScannerConnectRequest):
     """Connect to OBD2 scanner"""
     try:
         # Get available ports
-        available_ports = scanner.list_available_ports()
+        available_ports = await scanner.list_available_ports()
         
         # Set fast mode if requested
         if request.fast_mode:
             scanner._fast_mode = True
         
         # Connect to scanner
-        connected = scanner.connect(request.port)
+        connected = await scanner.run_io(scanner.connect, request.port)
         
         if connected:
             # Determine connection type
@@ -112,7 +112,7 @@ async def connect_scanner(request: ScannerConnectRequest):
 async def disconnect_scanner():
     """Disconnect from OBD2 scanner"""
     try:
-        scanner.disconnect()
+        await scanner.run_io(scanner.disconnect)
         return {"message": "Successfully disconnected from OBD2 scanner"}
     except Exception as e:
         logger.error(f"Error disconnecting from scanner: {e}")
@@ -132,7 +132,7 @@ async def get_scanner_status():
         if scanner.connected:
             try:
                 # Get battery voltage (PID 0142)
-                voltage_data = scanner.get_sensor_data("0142")
+                voltage_data = await scanner.run_io(scanner.get_sensor_data, "0142")
                 if voltage_data:
                     battery_voltage = voltage_data.value
                     
@@ -165,11 +165,7 @@ async def get_sensor_data(request: SensorDataRequest):
                 detail="Scanner not connected"
             )
         
-        sensor_data = []
-        for pid in request.pids:
-            data = scanner.get_sensor_data(pid)
-            if data:
-                sensor_data.append(data)
+        sensor_data = list((await scanner.run_io(scanner.get_multiple_sensor_data, request.pids)).values())
         
         return SensorDataResponse(
             timestamp=datetime.now(),
@@ -197,20 +193,20 @@ async def get_dtc_codes():
                 detail="Scanner not connected"
             )
         
-        codes = scanner.get_dtc_codes()
+        codes = await scanner.run_io(scanner.get_dtc_codes)
+        
+        descriptions = get_code_descriptions(codes)
         
         # Enhanced DTC information
         enhanced_dtcs = []
-        for code in codes:
+        for code, description, category in zip(codes, descriptions, categorize_dtcs(codes)):
             enhanced_dtcs.append({
                 "code": code,
-                "description": get_code_description(code),
-                "category": categorize_dtc(code),
+                "description": description,
+                "category": category,
                 "severity": get_dtc_severity(code)
             })
         
-        descriptions = [get_code_description(code) for code in codes]
-        
         return DTCResponse(
             timestamp=datetime.now(),
             codes=codes,
@@ -239,7 +235,7 @@ async def get_vehicle_info():
                 detail="Scanner not connected"
             )
         
-        info = scanner.get_vehicle_info()
+        info = await scanner.run_io(scanner.get_vehicle_info)
         
         return VehicleInfoResponse(
             timestamp=datetime.now(),
@@ -305,7 +301,7 @@ async def process_manual_data(request: ManualDataRequest):
             detail=f"Failed to process manual data: {str(e)}"
         )
 
-@router.post("/scanner/scan-session", response_model=ScanSessionResponse)
+@router.post("/scanner/scan-session", response_model=ScanSessionResponse, response_model_exclude_none=True)
 async def start_scan_session(request: ScanSessionRequest, background_tasks: BackgroundTasks):
     """Start a new scan session"""
     try:
@@ -358,7 +354,7 @@ async def start_scan_session(request: ScanSessionRequest, background_tasks: Back
             detail=f"Failed to start scan session: {str(e)}"
         )
 
-@router.get("/scanner/scan-session/{session_id}", response_model=ScanSessionResponse)
+@router.get("/scanner/scan-session/{session_id}", response_model=ScanSessionResponse, response_model_exclude_none=True)
 async def get_scan_session(session_id: str):
     """Get scan session results"""
     try:
@@ -407,28 +403,26 @@ async def perform_scan_session(session_id: str, include_sensors: bool, include_d
         if include_sensors:
             common_pids = ["0105", "010C", "010D", "010F", "0111"]  # Common sensor PIDs
             sensor_data = []
-            for pid in common_pids:
-                sensor = scanner.get_sensor_data(pid)
-                if sensor:
-                    sensor_data.append({
-                        "pid": sensor.pid,
-                        "value": sensor.value,
-                        "unit": sensor.unit,
-                        "description": sensor.description
-                    })
+            for sensor in (await scanner.run_io(scanner.get_multiple_sensor_data, common_pids)).values():
+                sensor_data.append({
+                    "pid": sensor.pid,
+                    "value": sensor.value,
+                    "unit": sensor.unit,
+                    "description": sensor.description
+                })
             data["sensors"] = sensor_data
         
         # Get DTC codes
         if include_dtc:
-            codes = scanner.get_dtc_codes()
-            descriptions = [get_code_description(code) for code in codes]
+            codes = await scanner.run_io(scanner.get_dtc_codes)
+            descriptions = get_code_descriptions(codes)
             data["dtc_codes"] = codes
             data["dtc_descriptions"] = descriptions
             data["dtc_count"] = len(codes)
         
         # Get vehicle info
         if include_vehicle_info:
-            vehicle_info = scanner.get_vehicle_info()
+            vehicle_info = await scanner.run_io(scanner.get_vehicle_info)
             data["vehicle_info"] = vehicle_info
         
         # Update session
@@ -444,11 +438,11 @@ async def perform_scan_session(session_id: str, include_sensors: bool, include_d
 async def pair_bluetooth_device(request: BluetoothPairRequest):
     """Pair with a Bluetooth OBD2 device"""
     try:
-        success = scanner.pair_bluetooth_device(request.device_name, request.pin)
+        success = await scanner.run_io(scanner.pair_bluetooth_device, request.device_name, request.pin)
         
         if success:
             # Try to find the paired port
-            ports = scanner.list_available_ports()
+            ports = await scanner.list_available_ports()
             paired_port = None
             for port in ports:
                 if (port.get("connection_type") == "bluetooth" and 
@@ -548,28 +542,15 @@ async def debug_command(request: dict):
         }
         
         try:
-            # Clear buffers
-            scanner.serial_conn.reset_input_buffer()
-            scanner.serial_conn.reset_output_buffer()
-            debug_info["buffers_cleared"] = True
-            
-            # Send command
+            # Raw exchange on the scanner's I/O thread so it cannot interleave with other commands
             cmd = f"{command}\r".encode()
-            bytes_written = scanner.serial_conn.write(cmd)
-            scanner.serial_conn.flush()
+            bytes_written, raw_data = await scanner.run_io(scanner.send_raw_command, cmd)
+            debug_info["buffers_cleared"] = True
             debug_info["bytes_written"] = bytes_written
             debug_info["command_bytes"] = repr(cmd)
+            debug_info["bytes_waiting"] = len(raw_data)
             
-            # Wait a moment
-            time.sleep(0.5)
-            
-            # Check for data
-            bytes_waiting = scanner.serial_conn.in_waiting
-            debug_info["bytes_waiting"] = bytes_waiting
-            
-            # Try to read raw bytes
-            if bytes_waiting > 0:
-                raw_data = scanner.serial_conn.read(bytes_waiting)
+            if raw_data:
                 debug_info["raw_response"] = repr(raw_data)
                 debug_info["decoded_response"] = raw_data.decode('utf-8', errors='ignore')
             else:
@@ -577,7 +558,7 @@ async def debug_command(request: dict):
                 debug_info["decoded_response"] = ""
             
             # Try the normal command method
-            normal_response = scanner._send_command(command)
+            normal_response = await scanner.run_io(scanner._send_command, command)
             debug_info["normal_response"] = repr(normal_response)
             
         except Exception as serial_error:
@@ -617,23 +598,11 @@ async def try_different_line_endings():
         
         for ending_name, ending in endings.items():
             try:
-                # Clear buffers
-                scanner.serial_conn.reset_input_buffer()
-                scanner.serial_conn.reset_output_buffer()
-                
-                # Send ATZ with this ending
+                # Send ATZ with this ending and read whatever comes back
                 cmd = f"ATZ{ending}".encode()
-                bytes_written = scanner.serial_conn.write(cmd)
-                scanner.serial_conn.flush()
-                
-                # Wait and check for response
-                time.sleep(1)
-                bytes_waiting = scanner.serial_conn.in_waiting
-                
-                response = ""
-                if bytes_waiting > 0:
-                    raw_data = scanner.serial_conn.read(bytes_waiting)
-                    response = raw_data.decode('utf-8', errors='ignore')
+                bytes_written, raw_data = await scanner.run_io(scanner.send_raw_command, cmd)
+                bytes_waiting = len(raw_data)
+                response = raw_data.decode('utf-8', errors='ignore')
                 
                 results[ending_name] = {
                     "command_sent": repr(cmd),
@@ -714,35 +683,35 @@ async def test_ecu_connection():
         
         try:
             # Test basic connection
-            test_results["atz_reset"] = scanner._send_command("ATZ")
+            test_results["atz_reset"] = await scanner.run_io(scanner._send_command, "ATZ")
         except Exception as e:
             test_results["atz_reset"] = f"Error: {str(e)}"
         
         try:
-            test_results["ate0_echo"] = scanner._send_command("ATE0") 
+            test_results["ate0_echo"] = await scanner.run_io(scanner._send_command, "ATE0") 
         except Exception as e:
             test_results["ate0_echo"] = f"Error: {str(e)}"
         
         try:
-            test_results["atsp0_auto"] = scanner._send_command("ATSP0")
+            test_results["atsp0_auto"] = await scanner.run_io(scanner._send_command, "ATSP0")
         except Exception as e:
             test_results["atsp0_auto"] = f"Error: {str(e)}"
         
         try:
             # Test protocol detection
-            test_results["protocol_query"] = scanner._send_command("ATDP")
+            test_results["protocol_query"] = await scanner.run_io(scanner._send_command, "ATDP")
         except Exception as e:
             test_results["protocol_query"] = f"Error: {str(e)}"
         
         try:
             # Test supported PIDs
-            test_results["supported_pids"] = scanner._send_command("0100")
+            test_results["supported_pids"] = await scanner.run_io(scanner._send_command, "0100")
         except Exception as e:
             test_results["supported_pids"] = f"Error: {str(e)}"
         
         try:
             # Test simple sensor
-            test_results["engine_rpm"] = scanner._send_command("010C")
+            test_results["engine_rpm"] = await scanner.run_io(scanner._send_command, "010C")
         except Exception as e:
             test_results["engine_rpm"] = f"Error: {str(e)}"
         
@@ -820,10 +789,10 @@ async def scan_protocols():
         for protocol_num, protocol_name in protocols.items():
             try:
                 # Set protocol
-                set_response = scanner._send_command(f"ATSP{protocol_num}")
+                set_response = await scanner.run_io(scanner._send_command, f"ATSP{protocol_num}")
                 
                 # Test with supported PIDs
-                test_response = scanner._send_command("0100")
+                test_response = await scanner.run_io(scanner._send_command, "0100")
                 
                 # Check if we got valid data
                 valid = ("41 00" in test_response and "NO DATA" not in test_response and 
@@ -873,7 +842,7 @@ async def get_enhanced_dtc_analysis():
                 detail="Scanner not connected"
             )
         
-        codes = scanner.get_dtc_codes()
+        codes = await scanner.run_io(scanner.get_dtc_codes)
         
         # Enhanced DTC analysis
         enhanced_analysis = {
@@ -1025,23 +994,23 @@ async def scan_dtc_codes():
     """Scan for DTC codes formatted for Flutter app"""
     try:
         if not scanner.connected:
-            return DTCListResponse(
+            return DTCListResponse.model_construct(
                 active_codes=[],
                 pending_codes=[]
             )
         
         # Get active codes
-        active_codes = scanner.get_dtc_codes()
+        active_codes = await scanner.run_io(scanner.get_dtc_codes)
         active_dtc_list = []
         
         for code in active_codes:
             description = get_code_description(code)
-            active_dtc_list.append(DTCCode(code=code, description=description))
+            active_dtc_list.append(DTCCode.model_construct(code=code, description=description))
         
         # For now, return empty pending codes - would need scanner implementation
         pending_dtc_list = []
         
-        return DTCListResponse(
+        return DTCListResponse.model_construct(
             active_codes=active_dtc_list,
             pending_codes=pending_dtc_list
         )
@@ -1065,7 +1034,7 @@ async def clear_dtc_codes(request: DTCRequest):
         
         if request.clear_codes:
             # Send clear codes command
-            response = scanner._send_command("04")  # Clear DTC codes command
+            response = await scanner.run_io(scanner._send_command, "04")  # Clear DTC codes command
             
             return {
                 "message": "DTC codes cleared successfully",
@@ -1089,7 +1058,7 @@ async def clear_dtc_codes(request: DTCRequest):
 async def get_vehicle_health_check():
     """Get vehicle health check status using real OBD2 scanner data"""
     try:
-        health_status = VehicleHealthResponse()
+        health_status = VehicleHealthResponse.model_construct()
         
         if not scanner.connected:
             logger.warning("Scanner not connected - returning unknown health status")
@@ -1097,36 +1066,36 @@ async def get_vehicle_health_check():
         
         try:
             # Get DTC codes to assess health
-            dtc_codes = scanner.get_dtc_codes()
+            dtc_codes = await scanner.run_io(scanner.get_dtc_codes)
             logger.info(f"Found {len(dtc_codes)} DTC codes for health analysis: {dtc_codes}")
             
             # Initialize all systems as good only if no DTC codes
             if not dtc_codes:
-                health_status.engine = "good"
-                health_status.transmission = "good"
-                health_status.emissions = "good"
-                health_status.fuel_system = "good"
-                health_status.cooling_system = "good"
-                health_status.electrical_system = "good"
-                health_status.brake_system = "good"
-                health_status.exhaust_system = "good"
+                health_status.engine = HealthStatus.GOOD
+                health_status.transmission = HealthStatus.GOOD
+                health_status.emissions = HealthStatus.GOOD
+                health_status.fuel_system = HealthStatus.GOOD
+                health_status.cooling_system = HealthStatus.GOOD
+                health_status.electrical_system = HealthStatus.GOOD
+                health_status.brake_system = HealthStatus.GOOD
+                health_status.exhaust_system = HealthStatus.GOOD
             else:
                 # Start with warning status if we have ANY DTC codes
-                health_status.engine = "warning"
-                health_status.transmission = "warning"
-                health_status.emissions = "warning"
-                health_status.fuel_system = "warning"
-                health_status.cooling_system = "warning"
-                health_status.electrical_system = "warning"
-                health_status.brake_system = "warning"
-                health_status.exhaust_system = "warning"
+                health_status.engine = HealthStatus.WARNING
+                health_status.transmission = HealthStatus.WARNING
+                health_status.emissions = HealthStatus.WARNING
+                health_status.fuel_system = HealthStatus.WARNING
+                health_status.cooling_system = HealthStatus.WARNING
+                health_status.electrical_system = HealthStatus.WARNING
+                health_status.brake_system = HealthStatus.WARNING
+                health_status.exhaust_system = HealthStatus.WARNING
             
             # Check DTC codes and update system status based on actual codes
             for code in dtc_codes:
                 severity = get_dtc_severity(code)
-                status_level = "critical" if severity == "Critical" else "warning"
+                status_level = HealthStatus.CRITICAL if severity == "Critical" else HealthStatus.WARNING
                 
-                logger.info(f"Processing DTC {code} with severity {severity} -> {status_level}")
+                logger.info(f"Processing DTC {code} with severity {severity} -> {status_level.value}")
                 
                 # Categorize by code prefix - be more specific about system affected
                 if code.startswith("P00") or code.startswith("P01"):  # Fuel/Air system
@@ -1155,17 +1124,17 @@ async def get_vehicle_health_check():
                     
             # Check cooling system with engine temp
             try:
-                temp_data = scanner.get_sensor_data("0105")  # Engine coolant temp
+                temp_data = await scanner.run_io(scanner.get_sensor_data, "0105")  # Engine coolant temp
                 if temp_data and temp_data.value:
                     logger.info(f"Engine coolant temp: {temp_data.value}°C")
                     if temp_data.value > 110:  # Over 110°C - critical
-                        health_status.cooling_system = "critical"
+                        health_status.cooling_system = HealthStatus.CRITICAL
                     elif temp_data.value > 100:  # Over 100°C - warning
-                        health_status.cooling_system = "warning"
+                        health_status.cooling_system = HealthStatus.WARNING
                     else:
                         # Only mark as good if no DTC codes and temp is normal
                         if not dtc_codes:
-                            health_status.cooling_system = "good"
+                            health_status.cooling_system = HealthStatus.GOOD
                 else:
                     logger.warning("Could not read engine coolant temperature")
             except Exception as temp_error:
@@ -1174,16 +1143,16 @@ async def get_vehicle_health_check():
         except Exception as e:
             logger.error(f"Error getting detailed health check: {e}")
             # Return warning status if we can't get detailed check
-            health_status.engine = "warning"
-            health_status.transmission = "warning"
-            health_status.emissions = "warning"
-            health_status.fuel_system = "warning"
-            health_status.cooling_system = "warning"
-            health_status.electrical_system = "warning"
-            health_status.brake_system = "warning"
-            health_status.exhaust_system = "warning"
+            health_status.engine = HealthStatus.WARNING
+            health_status.transmission = HealthStatus.WARNING
+            health_status.emissions = HealthStatus.WARNING
+            health_status.fuel_system = HealthStatus.WARNING
+            health_status.cooling_system = HealthStatus.WARNING
+            health_status.electrical_system = HealthStatus.WARNING
+            health_status.brake_system = HealthStatus.WARNING
+            health_status.exhaust_system = HealthStatus.WARNING
             
-        logger.info(f"Final health status: {health_status.dict()}")
+        logger.info(f"Final health status: {health_status.model_dump(mode='json')}")
         return health_status
         
     except Exception as e:
@@ -1216,7 +1185,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
         logger.info(f"Starting {request.scan_type} diagnostic scan {scan_id}")
         
         # Initialize response
-        response = FullDiagnosticScanResponse(
+        response = FullDiagnosticScanResponse.model_construct(
             scan_id=scan_id,
             scan_type=request.scan_type,
             timestamp=datetime.now(),
@@ -1228,7 +1197,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
         # 1. Get VIN if requested
         if request.include_vin:
             try:
-                vin = scanner.get_vin_from_obd2()
+                vin = await scanner.run_io(scanner.get_vin_from_obd2)
                 if vin:
                     response.vehicle_info = VehicleInformation(vin=vin)
                     logger.info(f"Retrieved VIN: {vin}")
@@ -1240,21 +1209,21 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
         # 2. Get all types of trouble codes
         try:
             # Active codes
-            active_codes = scanner.get_dtc_codes()
+            active_codes = await scanner.run_io(scanner.get_dtc_codes)
             response.active_codes_count = len(active_codes)
             
             # Pending codes
-            pending_codes = scanner.get_pending_dtc_codes()
+            pending_codes = await scanner.run_io(scanner.get_pending_dtc_codes)
             response.pending_codes_count = len(pending_codes)
             
             # Permanent codes
-            permanent_codes = scanner.get_permanent_dtc_codes()
+            permanent_codes = await scanner.run_io(scanner.get_permanent_dtc_codes)
             response.permanent_codes_count = len(permanent_codes)
             
             # Process all codes
             all_codes = []
             for code in active_codes:
-                all_codes.append(TroubleCodeInfo(
+                all_codes.append(TroubleCodeInfo.model_construct(
                     code=code,
                     description=get_code_description(code),
                     system=categorize_dtc(code),
@@ -1264,7 +1233,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
             
             for code in pending_codes:
                 if code not in active_codes:  # Avoid duplicates
-                    all_codes.append(TroubleCodeInfo(
+                    all_codes.append(TroubleCodeInfo.model_construct(
                         code=code,
                         description=get_code_description(code),
                         system=categorize_dtc(code),
@@ -1274,7 +1243,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
             
             for code in permanent_codes:
                 if code not in active_codes and code not in pending_codes:  # Avoid duplicates
-                    all_codes.append(TroubleCodeInfo(
+                    all_codes.append(TroubleCodeInfo.model_construct(
                         code=code,
                         description=get_code_description(code),
                         system=categorize_dtc(code),
@@ -1290,7 +1259,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
         
         # 3. Get readiness monitors
         try:
-            monitors_data = scanner.get_readiness_monitors()
+            monitors_data = await scanner.run_io(scanner.get_readiness_monitors)
             readiness_monitors = []
             ready_count = 0
             not_ready_count = 0
@@ -1317,7 +1286,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
         # 4. Get live parameters if requested
         if request.include_live_parameters:
             try:
-                live_params = scanner.get_live_parameters(request.scan_type)
+                live_params = await scanner.run_io(scanner.get_live_parameters, request.scan_type)
                 live_parameters = []
                 
                 for param_name, param_data in live_params.items():
@@ -1338,7 +1307,7 @@ async def perform_full_diagnostic_scan(request: FullDiagnosticScanRequest):
             try:
                 freeze_frames = []
                 for trouble_code in response.trouble_codes[:3]:  # Limit to first 3 codes
-                    frame_data = scanner.get_freeze_frame_data(trouble_code.code)
+                    frame_data = await scanner.run_io(scanner.get_freeze_frame_data, trouble_code.code)
                     for frame in frame_data:
                         freeze_frames.append(FreezeFrameData(
                             dtc_code=frame["dtc_code"],
@@ -1,6 +1,16 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Optional, Literal
 from datetime import datetime
+from enum import Enum
+
+# Config for response-only models that are never mutated after construction
+RESPONSE_MODEL_CONFIG = ConfigDict(frozen=True, extra="forbid", defer_build=True)
+
+# Config for small per-row models repeated inside scan responses
+ROW_MODEL_CONFIG = ConfigDict(frozen=True)
+
+# Scan types accepted by the full diagnostic scan and upload endpoints
+ScanType = Literal["quick", "comprehensive", "emissions", "custom"]
 
 class ScannerConnectRequest(BaseModel):
     """Request to connect to OBD2 scanner"""
@@ -12,6 +22,8 @@ class ScannerConnectRequest(BaseModel):
 
 class ScannerConnectResponse(BaseModel):
     """Response for scanner connection"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     connected: bool
     port: Optional[str] = None
     connection_type: Optional[str] = None
@@ -24,6 +36,7 @@ class SensorDataRequest(BaseModel):
 
 class SensorData(BaseModel):
     """Individual sensor data"""
+    model_config = ROW_MODEL_CONFIG
     pid: str
     value: float
     unit: str
@@ -31,6 +44,8 @@ class SensorData(BaseModel):
 
 class SensorDataResponse(BaseModel):
     """Response with sensor data"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     timestamp: datetime
     data: List[SensorData]
     success: bool
@@ -38,6 +53,8 @@ class SensorDataResponse(BaseModel):
 
 class DTCResponse(BaseModel):
     """Response with DTC codes"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     timestamp: datetime
     codes: List[str]
     descriptions: List[str]
@@ -47,6 +64,8 @@ class DTCResponse(BaseModel):
 
 class VehicleInfoResponse(BaseModel):
     """Response with vehicle information"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     timestamp: datetime
     vin: Optional[str] = None
     calibration_ids: List[str] = []
@@ -55,6 +74,8 @@ class VehicleInfoResponse(BaseModel):
 
 class ScannerStatusResponse(BaseModel):
     """Response with scanner status"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     connected: bool
     port: Optional[str] = None
     baudrate: Optional[int] = None
@@ -74,13 +95,28 @@ class ScanSessionRequest(BaseModel):
     include_dtc: bool = Field(True, description="Include DTC codes in scan")
     include_vehicle_info: bool = Field(True, description="Include vehicle information")
 
+class ScanSessionVehicleInfo(BaseModel):
+    """Vehicle information collected during a scan session"""
+    vin: Optional[str] = None
+    calibration_ids: Optional[List[str]] = None
+
+class ScanSessionData(BaseModel):
+    """Results collected by a background scan session"""
+    sensors: Optional[List[SensorData]] = None
+    dtc_codes: Optional[List[str]] = None
+    dtc_descriptions: Optional[List[str]] = None
+    dtc_count: Optional[int] = None
+    vehicle_info: Optional[ScanSessionVehicleInfo] = None
+
 class ScanSessionResponse(BaseModel):
     """Response for scan session"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     session_id: str
     session_name: str
     timestamp: datetime
-    status: str  # "running", "completed", "failed"
-    data: Dict[str, Any] = {}
+    status: Literal["running", "completed", "failed"]
+    data: ScanSessionData = Field(default_factory=ScanSessionData)
     message: str
 
 class BluetoothPairRequest(BaseModel):
@@ -90,13 +126,15 @@ class BluetoothPairRequest(BaseModel):
 
 class BluetoothPairResponse(BaseModel):
     """Response for Bluetooth pairing"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     success: bool
     device_name: str
     message: str
     paired_port: Optional[str] = None
 
-class LiveDataRequest(BaseModel):
-    """Request to store live OBD2 data from Flutter app"""
+class LiveDataBase(BaseModel):
+    """Shared live OBD2 data fields"""
     rpm: Optional[int] = None
     speed: Optional[int] = None
     engine_temp: Optional[int] = None
@@ -105,15 +143,12 @@ class LiveDataRequest(BaseModel):
     vin: Optional[str] = Field(None, description="Vehicle Identification Number from OBD2")
     timestamp: Optional[datetime] = None
 
-class LiveDataResponse(BaseModel):
+class LiveDataRequest(LiveDataBase):
+    """Request to store live OBD2 data from Flutter app"""
+
+class LiveDataResponse(LiveDataBase):
     """Response with live OBD2 data for Flutter app"""
-    rpm: Optional[int] = None
-    speed: Optional[int] = None
-    engine_temp: Optional[int] = None
-    fuel_level: Optional[int] = None
-    throttle_position: Optional[int] = None
-    vin: Optional[str] = Field(None, description="Vehicle Identification Number from OBD2")
-    timestamp: Optional[datetime] = None
+    model_config = RESPONSE_MODEL_CONFIG
 
 class DTCRequest(BaseModel):
     """Request to clear DTC codes"""
@@ -121,27 +156,39 @@ class DTCRequest(BaseModel):
 
 class DTCCode(BaseModel):
     """Individual DTC code"""
+    model_config = ROW_MODEL_CONFIG
     code: str
     description: str
 
 class DTCListResponse(BaseModel):
     """Response with active and pending DTC codes"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     active_codes: List[DTCCode] = []
     pending_codes: List[DTCCode] = []
 
+class HealthStatus(str, Enum):
+    """Health level for a vehicle system"""
+    UNKNOWN = "unknown"
+    GOOD = "good"
+    WARNING = "warning"
+    CRITICAL = "critical"
+
 class VehicleHealthResponse(BaseModel):
     """Response with vehicle health check"""
-    engine: str = "unknown"
-    transmission: str = "unknown"
-    emissions: str = "unknown"
-    fuel_system: str = "unknown"
-    cooling_system: str = "unknown"
-    electrical_system: str = "unknown"
-    brake_system: str = "unknown"
-    exhaust_system: str = "unknown"
+    engine: HealthStatus = HealthStatus.UNKNOWN
+    transmission: HealthStatus = HealthStatus.UNKNOWN
+    emissions: HealthStatus = HealthStatus.UNKNOWN
+    fuel_system: HealthStatus = HealthStatus.UNKNOWN
+    cooling_system: HealthStatus = HealthStatus.UNKNOWN
+    electrical_system: HealthStatus = HealthStatus.UNKNOWN
+    brake_system: HealthStatus = HealthStatus.UNKNOWN
+    exhaust_system: HealthStatus = HealthStatus.UNKNOWN
 
 class ScannerStatusFlutterResponse(BaseModel):
     """Response with scanner status for Flutter app"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     connected: bool
     device_name: Optional[str] = None
     battery_voltage: Optional[float] = None
@@ -149,7 +196,7 @@ class ScannerStatusFlutterResponse(BaseModel):
 # Full Diagnostic Scan Schemas
 class FullDiagnosticScanRequest(BaseModel):
     """Request for full diagnostic scan"""
-    scan_type: str = Field(description="Type of scan: 'quick', 'comprehensive', 'emissions', 'custom'")
+    scan_type: ScanType = Field(description="Type of scan: 'quick', 'comprehensive', 'emissions', 'custom'")
     vehicle_id: Optional[int] = Field(None, description="Vehicle ID for database storage")
     custom_systems: Optional[List[str]] = Field(None, description="Custom systems to scan for 'custom' type")
     include_vin: bool = Field(True, description="Include VIN retrieval")
@@ -158,29 +205,36 @@ class FullDiagnosticScanRequest(BaseModel):
 
 class TroubleCodeInfo(BaseModel):
     """Enhanced trouble code information"""
+    model_config = ROW_MODEL_CONFIG
     code: str
     description: str
     system: str  # "Powertrain", "Body", "Chassis", "Network"
     severity: str  # "Critical", "Moderate", "Low"
-    status: str  # "Active", "Pending", "Permanent"
+    status: Literal["Active", "Pending", "Permanent"]
 
 class ReadinessMonitor(BaseModel):
     """Readiness monitor status"""
+    model_config = ROW_MODEL_CONFIG
     monitor_name: str
-    status: str  # "Ready", "Not Ready", "Not Supported"
+    status: Literal["Ready", "Not Ready", "Not Supported"]
     
 class LiveParameter(BaseModel):
     """Live parameter data"""
+    model_config = ROW_MODEL_CONFIG
     name: str
     value: Optional[float]
     unit: str
     min_value: Optional[float] = None
     max_value: Optional[float] = None
     
+class FreezeFrameValues(BaseModel):
+    """Freeze frame payload as read from the scanner"""
+    raw_data: str
+
 class FreezeFrameData(BaseModel):
     """Freeze frame data snapshot"""
     dtc_code: str
-    frame_data: Dict[str, Any]
+    frame_data: FreezeFrameValues
 
 class VehicleInformation(BaseModel):
     """Complete vehicle information"""
@@ -194,9 +248,9 @@ class VehicleInformation(BaseModel):
 class FullDiagnosticScanResponse(BaseModel):
     """Complete diagnostic scan results"""
     scan_id: str
-    scan_type: str
+    scan_type: ScanType
     timestamp: datetime
-    status: str  # "completed", "failed", "partial"
+    status: Literal["completed", "failed", "partial"]
     
     # Vehicle Information
     vehicle_info: Optional[VehicleInformation] = None
@@ -219,7 +273,7 @@ class FullDiagnosticScanResponse(BaseModel):
     freeze_frames: List[FreezeFrameData] = []
     
     # Summary
-    overall_health: str = "unknown"  # "good", "warning", "critical"
+    overall_health: Literal["unknown", "good", "warning", "critical"] = "unknown"
     scan_duration: Optional[float] = None
     error_messages: List[str] = []
 
@@ -245,7 +299,7 @@ class UploadScanLiveParameter(BaseModel):
 class UploadFullScanRequest(BaseModel):
     """Request to upload full scan data from Flutter app"""
     vehicle_id: int
-    scan_type: str  # 'quick', 'comprehensive', 'emissions', 'custom'
+    scan_type: ScanType
     vehicle_info: Optional[str] = ""
     trouble_codes: List[UploadScanTroubleCode] = []
     live_parameters: Dict[str, str] = {}
@@ -255,6 +309,8 @@ class UploadFullScanRequest(BaseModel):
 
 class UploadFullScanResponse(BaseModel):
     """Response for uploading full scan data"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     success: bool
     scan_id: int
     message: str
@@ -1,8 +1,10 @@
 # api/utils/auth.py
 import os
+import re
 import jwt
 import logging
-from datetime import datetime, timedelta
+from collections import defaultdict, deque
+from time import time
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -16,10 +18,24 @@ logger = logging.getLogger(__name__)
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-super-secret-jwt-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
+JWT_EXPIRATION_SECONDS = JWT_EXPIRATION_HOURS * 3600
 
 # Security scheme
 security = HTTPBearer()
 
+# Decoded token cache: token -> (payload, cached_at)
+TOKEN_CACHE_TTL = 60  # seconds
+TOKEN_CACHE_MAX_SIZE = 4096
+_token_cache: Dict[str, tuple] = {}
+
+# Authenticated user cache: user_id -> (detached User, cached_at)
+USER_CACHE_TTL = 30  # seconds
+USER_CACHE_MAX_SIZE = 10000
+_user_cache: Dict[int, tuple] = {}
+
+# Precompiled email pattern used by is_valid_email
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class AuthUtils:
     """Authentication utilities for JWT token management"""
     
@@ -27,12 +43,13 @@ class AuthUtils:
     def generate_jwt_token(user_data: Dict[str, Any]) -> str:
         """Generate JWT token for user"""
         try:
+            now = int(time())
             payload = {
                 "user_id": user_data["id"],
                 "email": user_data["email"],
                 "name": user_data.get("name"),
-                "exp": datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS),
-                "iat": datetime.utcnow(),
+                "exp": now + JWT_EXPIRATION_SECONDS,
+                "iat": now,
                 "type": "access"
             }
             
@@ -46,11 +63,30 @@ class AuthUtils:
                 detail="Could not generate authentication token"
             )
     
+    @staticmethod
+    def _decode_jwt_token(token: str) -> Dict[str, Any]:
+        """Decode JWT token, reusing a recently decoded payload when possible"""
+        now = time()
+        cached = _token_cache.get(token)
+        if cached:
+            payload, cached_at = cached
+            if now - cached_at < TOKEN_CACHE_TTL and payload.get("exp", 0) > now:
+                return payload
+            _token_cache.pop(token, None)  # Another request may have dropped it already
+        
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        
+        # Evict the oldest entry when full (dicts keep insertion order)
+        if len(_token_cache) >= TOKEN_CACHE_MAX_SIZE:
+            _token_cache.pop(next(iter(_token_cache), None), None)
+        _token_cache[token] = (payload, now)
+        return payload
+    
     @staticmethod
     def verify_jwt_token(token: str, db_session=None) -> Dict[str, Any]:
         """Verify and decode JWT token, checking blacklist if db_session provided"""
         try:
-            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+            payload = AuthUtils._decode_jwt_token(token)
             
             # Check token type
             if payload.get("type") != "access":
@@ -110,7 +146,11 @@ def get_current_user(
                 detail="Invalid token payload"
             )
         
-        # Get user from database
+        # Get user from cache or database
+        user = _get_cached_user(user_id)
+        if user:
+            return user
+        
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(
@@ -118,6 +158,9 @@ def get_current_user(
                 detail="User not found"
             )
         
+        # Detach so the cached row outlives this request's session
+        db.expunge(user)
+        _cache_user(user)
         return user
         
     except HTTPException:
@@ -129,6 +172,22 @@ def get_current_user(
             detail="Could not validate credentials"
         )
 
+def _get_cached_user(user_id: int) -> Optional[User]:
+    """Return a recently loaded user, or None if missing or stale"""
+    cached = _user_cache.get(user_id)
+    if cached:
+        user, cached_at = cached
+        if time() - cached_at < USER_CACHE_TTL:
+            return user
+        _user_cache.pop(user_id, None)
+    return None
+
+def _cache_user(user: User):
+    """Store a detached user for subsequent requests"""
+    if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+        _user_cache.pop(next(iter(_user_cache)), None)
+    _user_cache[user.id] = (user, time())
+
 def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
@@ -148,38 +207,49 @@ def get_optional_user(
 # Email validation utility
 def is_valid_email(email: str) -> bool:
     """Basic email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 # Rate limiting (simple in-memory implementation)
-from collections import defaultdict
-from time import time
-
 class RateLimiter:
     """Simple rate limiter for magic link requests"""
     
     def __init__(self):
-        self.requests = defaultdict(list)
+        self.requests = defaultdict(deque)
         self.max_requests = 3  # Max 3 requests
         self.window = 300  # 5 minutes window
+        self._last_sweep = time()
     
     def is_allowed(self, identifier: str) -> bool:
         """Check if request is allowed for identifier (email)"""
         now = time()
-        # Clean old requests
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier]
-            if now - req_time < self.window
-        ]
+        cutoff = now - self.window
+        
+        # Periodically drop identifiers with no requests left in the window
+        if now - self._last_sweep >= self.window:
+            self._sweep(cutoff)
+            self._last_sweep = now
+        
+        # Clean old requests (timestamps are appended in order)
+        timestamps = self.requests[identifier]
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
         
         # Check if under limit
-        if len(self.requests[identifier]) >= self.max_requests:
+        if len(timestamps) >= self.max_requests:
             return False
         
         # Add current request
-        self.requests[identifier].append(now)
+        timestamps.append(now)
         return True
+    
+    def _sweep(self, cutoff: float):
+        """Remove identifiers whose newest request is outside the window"""
+        stale = [
+            identifier for identifier, timestamps in self.requests.items()
+            if not timestamps or timestamps[-1] <= cutoff
+        ]
+        for identifier in stale:
+            del self.requests[identifier]
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
\ No newline at end of file
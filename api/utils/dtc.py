@@ -1,48 +1,210 @@
 # api/utils/dtc.py
+from array import array
+from bisect import bisect_left
+from collections import Counter
 from functools import lru_cache
 from pathlib import Path
-import json, os, requests
+from typing import Final, Iterable, List
+import mmap, os, pickle, re, requests
+import orjson
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 LOCAL_CODES = BASE_DIR / "resources" / "dtc_codes.json"
 ENHANCED_CODES_PATH = BASE_DIR / "resources" / "enhanced_dtc_codes.json"
+ENHANCED_CACHE_PATH = ENHANCED_CODES_PATH.with_suffix(".pkl")  # Pickled parse shared across worker processes
+MERGED_TABLE_PATH = BASE_DIR / "resources" / "dtc_table.bin"  # Packed lookup table, mmapped by each worker
+
+# DTC format helpers used by _clean_dtc_code
+_NON_ALNUM_RE = re.compile(r'[^A-Z0-9]')
+_HEX_SET: Final = frozenset('0123456789ABCDEF')
+_PREFIX_SET: Final = frozenset('PBCU')
+_PREFIX_INDEX: Final = {'P': 0, 'C': 1, 'B': 2, 'U': 3}
+
+# Scans report the same handful of codes repeatedly, so per-code helpers are memoized
+CODE_CACHE_SIZE = 4096
 
 
-@lru_cache
 def _local_table():
     try:
-        with LOCAL_CODES.open() as fp:
-            return json.load(fp)
-    except (FileNotFoundError, json.JSONDecodeError):
+        return orjson.loads(LOCAL_CODES.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
         return {}
 
-@lru_cache
-def _enhanced_table():
-    """Load comprehensive DTC database from JSON file with 11,000+ codes"""
+def _load_enhanced():
+    """Load and validate the enhanced DTC database: (codes by cleaned key, invalid keys)"""
+    cached = _read_enhanced_cache()
+    if cached is not None:
+        return cached
+    
     try:
-        with ENHANCED_CODES_PATH.open(encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        raw = orjson.loads(ENHANCED_CODES_PATH.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError) as e:
         print(f"Warning: Could not load enhanced DTC codes: {e}")
-        return {}
+        return {}, []
+    
+    table = {}
+    invalid_codes = []
+    for code, desc in raw.items():
+        if _is_well_formed(code):
+            table[code] = desc
+            continue
+        cleaned_code = _clean_dtc_code(code)
+        if cleaned_code:
+            table.setdefault(cleaned_code, desc)
+        else:
+            invalid_codes.append(code)
+    
+    _write_enhanced_cache((table, invalid_codes))
+    return table, invalid_codes
+
+def _read_enhanced_cache():
+    """Return the pickled (table, invalid keys) if it is at least as new as the JSON file"""
+    try:
+        if ENHANCED_CACHE_PATH.stat().st_mtime < ENHANCED_CODES_PATH.stat().st_mtime:
+            return None
+        return pickle.loads(ENHANCED_CACHE_PATH.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+def _write_enhanced_cache(result):
+    """Pickle the validated table so other worker processes skip the JSON parse"""
+    tmp_path = ENHANCED_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp_path, ENHANCED_CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: Could not write DTC cache: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+def _enhanced_table():
+    """Comprehensive DTC database from JSON file with 11,000+ codes"""
+    return _load_enhanced()[0]
+
+@lru_cache(maxsize=1)
+def _merged_table():
+    """Single lookup table: enhanced codes with local overrides applied on top"""
+    # Reuse the mmap-backed table written by an earlier process if the sources are unchanged
+    try:
+        sources_mtime = max(LOCAL_CODES.stat().st_mtime, ENHANCED_CODES_PATH.stat().st_mtime)
+        if MERGED_TABLE_PATH.stat().st_mtime >= sources_mtime:
+            return CompactDTCTable.from_file(MERGED_TABLE_PATH)
+    except (OSError, ValueError):
+        pass
+    
+    merged = {code: desc for code, desc in _enhanced_table().items() if desc}
+    merged.update((code, desc) for code, desc in _local_table().items() if desc and _is_well_formed(code))
+    table = CompactDTCTable.from_dict(merged)
+    
+    try:
+        table.save(MERGED_TABLE_PATH)
+        return CompactDTCTable.from_file(MERGED_TABLE_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not write DTC table: {e}")
+        return table
+
+class CompactDTCTable:
+    """Read-only DTC -> description map packed into arrays and one UTF-8 blob
+    
+    Codes are stored as sorted 18-bit integers (system index << 16 | hex value)
+    and descriptions as slices of a single bytes object, so a worker keeps a few
+    hundred KB resident instead of a dict plus thousands of str objects. Loaded
+    from disk, the arrays are views over an mmap and only touched pages are read.
+    """
+    
+    _MAGIC = b"DTC1"
+    
+    def __init__(self, keys, offsets, blob):
+        self._keys = keys
+        self._offsets = offsets
+        self._blob = blob
+    
+    @classmethod
+    def from_dict(cls, table: dict) -> "CompactDTCTable":
+        items = sorted((_pack_code(code), desc) for code, desc in table.items())
+        keys = array('I', (key for key, _ in items))
+        offsets = array('I', [0])
+        blob = bytearray()
+        for _, desc in items:
+            blob += desc.encode('utf-8')
+            offsets.append(len(blob))
+        return cls(keys, offsets, bytes(blob))
+    
+    @classmethod
+    def from_file(cls, path: Path) -> "CompactDTCTable":
+        """Map a file written by save(): magic, count, keys, offsets, descriptions"""
+        with path.open('rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:4] != cls._MAGIC:
+            raise ValueError(f"Not a DTC table file: {path}")
+        
+        view = memoryview(mm)
+        itemsize = array('I').itemsize
+        count = int.from_bytes(mm[4:8], 'little')
+        keys_end = 8 + count * itemsize
+        offsets_end = keys_end + (count + 1) * itemsize
+        keys = view[8:keys_end].cast('I')
+        offsets = view[keys_end:offsets_end].cast('I')
+        return cls(keys, offsets, view[offsets_end:])
+    
+    def save(self, path: Path):
+        """Write the table atomically so concurrent workers never map a partial file"""
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with tmp_path.open('wb') as f:
+                f.write(self._MAGIC)
+                f.write(len(self._keys).to_bytes(4, 'little'))
+                f.write(bytes(self._keys))
+                f.write(bytes(self._offsets))
+                f.write(self._blob)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    
+    def get(self, code: str, default=None):
+        if not _is_well_formed(code):
+            return default
+        key = _pack_code(code)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return default
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+    
+    def __contains__(self, code) -> bool:
+        return self.get(code) is not None
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+
+def _pack_code(code: str) -> int:
+    """Pack a well-formed DTC into an integer key"""
+    return (_PREFIX_INDEX[code[0]] << 16) | int(code[1:], 16)
+
+def _is_well_formed(code: str) -> bool:
+    """True if code is already a canonical 5-character DTC"""
+    return len(code) == 5 and code[0] in _PREFIX_SET and _HEX_SET.issuperset(code[1:])
 
 def _clean_dtc_code(code: str) -> str:
     """Clean and validate DTC code format"""
     if not code:
         return ""
     
-    code = code.strip().upper()
-    
-    # Remove any non-alphanumeric characters
-    import re
-    code = re.sub(r'[^A-Z0-9]', '', code)
+    return _clean_normalized_code(code.strip().upper())
+
+@lru_cache(maxsize=CODE_CACHE_SIZE)
+def _clean_normalized_code(code: str) -> str:
+    """Clean and validate a DTC code that is already stripped and uppercased"""
+    # Remove any non-alphanumeric characters (the C-level str checks skip the regex for clean input)
+    if not (code.isascii() and code.isalnum()):
+        code = _NON_ALNUM_RE.sub('', code)
+        if not code:
+            return ""
     
     # If already correct format, return as-is
-    if len(code) == 5 and code[0] in 'PBCU' and all(c in '0123456789ABCDEF' for c in code[1:]):
+    if _is_well_formed(code):
         return code
     
     # Handle malformed patterns
-    if code[0] in 'PBCU' and len(code) > 5:
+    if code[0] in _PREFIX_SET and len(code) > 5:
         # Extract the meaningful part after the prefix
         numeric_part = code[1:]
         
@@ -73,136 +235,167 @@ def _clean_dtc_code(code: str) -> str:
         code = code[0] + numeric_part
     
     # Final validation
-    if len(code) == 5 and code[0] in 'PBCU' and all(c in '0123456789ABCDEF' for c in code[1:]):
+    if _is_well_formed(code):
         return code
     
     return ""
 
+@lru_cache(maxsize=CODE_CACHE_SIZE)
 def get_code_description(code: str) -> str:
     """Get DTC description with multiple fallback sources"""
     code = code.strip().upper()
+    table = _merged_table()
     
-    # Clean and validate the code format
-    cleaned_code = _clean_dtc_code(code)
+    # Codes already in the validated table need no cleaning
+    description = table.get(code)
+    if description is not None:
+        return description
+    
+    # Clean and validate the code format (scanner output is already well-formed)
+    cleaned_code = code if _is_well_formed(code) else _clean_normalized_code(code)
     if not cleaned_code:
         return f"Invalid DTC format: {code}"
     
     # Priority order: local overrides -> enhanced database -> generic
-    return (
-        _local_table().get(cleaned_code)
-        or _enhanced_table().get(cleaned_code)
-        or _generate_generic_description(cleaned_code)
-    )
+    description = table.get(cleaned_code)
+    if description is not None:
+        return description
+    return _generate_generic_description(cleaned_code)
+
+def get_code_descriptions(codes: Iterable[str]) -> List[str]:
+    """Get DTC descriptions for a batch of codes in one pass"""
+    table = _merged_table()
+    descriptions = []
+    for code in codes:
+        code = code.strip().upper()
+        description = table.get(code)
+        if description is not None:
+            descriptions.append(description)
+            continue
+        cleaned_code = code if _is_well_formed(code) else _clean_normalized_code(code)
+        if not cleaned_code:
+            descriptions.append(f"Invalid DTC format: {code}")
+            continue
+        description = table.get(cleaned_code)
+        if description is None:
+            description = _generate_generic_description(cleaned_code)
+        descriptions.append(description)
+    return descriptions
+
+# Generic description prefixes keyed by DTC system letter
+_GENERIC_TEMPLATES: Final = {
+    'P': 'Powertrain Diagnostic Trouble Code ',
+    'B': 'Body Diagnostic Trouble Code ',
+    'C': 'Chassis Diagnostic Trouble Code ',
+    'U': 'Network/Communication Diagnostic Trouble Code '
+}
+_GENERIC_UNKNOWN_TEMPLATE: Final = 'Unknown System Diagnostic Trouble Code '
 
 def _generate_generic_description(code: str) -> str:
     """Generate a generic description based on DTC code pattern"""
     if not code or len(code) < 5:
         return "Unknown code"
     
-    prefix = code[0]
-    system_map = {
-        'P': 'Powertrain',
-        'B': 'Body',
-        'C': 'Chassis', 
-        'U': 'Network/Communication'
-    }
-    
-    system = system_map.get(prefix, 'Unknown System')
-    return f"{system} Diagnostic Trouble Code {code}"
+    return _GENERIC_TEMPLATES.get(code[0], _GENERIC_UNKNOWN_TEMPLATE) + code
+
+# System categories keyed by DTC prefix
+DTC_CATEGORIES: Final = {
+    'P': 'Powertrain (Engine/Transmission)',
+    'B': 'Body (Interior/Exterior)',
+    'C': 'Chassis (Brakes/Steering/Suspension)',
+    'U': 'Network/Communication'
+}
 
+@lru_cache(maxsize=CODE_CACHE_SIZE)
 def categorize_dtc(code: str) -> str:
     """Categorize DTC by system type"""
     if not code:
         return "Unknown"
     
-    prefix = code[0].upper()
-    categories = {
-        'P': 'Powertrain (Engine/Transmission)',
-        'B': 'Body (Interior/Exterior)',
-        'C': 'Chassis (Brakes/Steering/Suspension)',
-        'U': 'Network/Communication'
-    }
+    return DTC_CATEGORIES.get(code[0].upper(), "Unknown System")
+
+def categorize_dtcs(codes: Iterable[str]) -> List[str]:
+    """Categorize a batch of DTCs by system type"""
+    get_category = DTC_CATEGORIES.get
+    return [get_category(code[0].upper(), "Unknown System") if code else "Unknown" for code in codes]
+
+# Severity by 4-character code prefix (critical and moderate patterns)
+SEVERITY_BY_PREFIX: Final = {
+    # Critical codes that need immediate attention
+    'P030': "Critical",  # Misfire codes (P0300-P0312)
+    'P056': "Critical",  # System voltage issues (P0562, P0563)
+    'P060': "Critical",  # PCM/ECM memory errors (P0601-P0605)
+    'C000': "Critical",  # Critical chassis codes (some sensors)
+    'B000': "Critical",  # Airbag system failures
+    # Moderate priority codes (emissions, comfort, etc.)
+    'P042': "Moderate",  # Catalyst codes (P0420, P0430)
+    'P044': "Moderate",  # EVAP codes (P0440-P0455)
+    'P013': "Moderate",  # O2 sensor codes (P0130-P0139)
+    'P070': "Moderate",  # Transmission codes
+    'P075': "Moderate",  # Shift solenoid codes
+    'P076': "Moderate",  # Shift solenoid codes
+}
+
+# High priority codes
+HIGH_PRIORITY_CODES: Final = frozenset({
+    'P0100', 'P0101', 'P0102', 'P0103',  # MAF issues
+    'P0115', 'P0117', 'P0118',          # Coolant temp issues
+    'P0120', 'P0121', 'P0122', 'P0123', # Throttle position issues
+    'P0171', 'P0172', 'P0174', 'P0175', # Fuel trim issues
+    'P0500',                             # Vehicle speed sensor
+})
+
+# Default severity per system (B000 airbag and C000 codes are critical via SEVERITY_BY_PREFIX)
+SYSTEM_SEVERITY: Final = {
+    'P': "Low",       # Default for P-codes
+    'B': "Low",       # Body system codes (usually low priority unless safety-related)
+    'C': "Moderate",  # Chassis codes (brakes, suspension, etc.)
+    'U': "Moderate",  # Network/Communication issues
+}
+
+# ABS and brake-related chassis codes are more serious
+HIGH_PRIORITY_PREFIXES: Final = ('C100',)
+
+SEVERITY_LEVELS: Final = ("Low", "Moderate", "High", "Critical")
+
+def _build_severity_table() -> bytes:
+    """Severity level index for every packed DTC, applying rules from lowest to highest precedence"""
+    level = {name: i for i, name in enumerate(SEVERITY_LEVELS)}
+    table = bytearray(len(_PREFIX_INDEX) << 16)
+    
+    def fill(prefix: str, severity: str):
+        start = _pack_code(prefix.ljust(5, '0'))
+        span = 16 ** (5 - len(prefix))
+        table[start:start + span] = bytes([level[severity]]) * span
     
-    return categories.get(prefix, "Unknown System")
+    for system, severity in SYSTEM_SEVERITY.items():
+        fill(system, severity)
+    for prefix in HIGH_PRIORITY_PREFIXES:
+        fill(prefix, "High")
+    for code in HIGH_PRIORITY_CODES:
+        fill(code, "High")
+    for prefix, severity in SEVERITY_BY_PREFIX.items():
+        fill(prefix, severity)
+    return bytes(table)
 
+# 256 KB table indexed by _pack_code(code) replaces per-call rule checks
+_SEVERITY_TABLE: Final = _build_severity_table()
+
+@lru_cache(maxsize=CODE_CACHE_SIZE)
 def get_dtc_severity(code: str) -> str:
     """Estimate DTC severity level"""
     code = code.upper().strip()
     
     # Clean the code first
-    cleaned_code = _clean_dtc_code(code)
+    cleaned_code = code if _is_well_formed(code) else _clean_normalized_code(code)
     if not cleaned_code:
         return "Unknown"
     
-    # Critical codes that need immediate attention
-    critical_patterns = [
-        'P030',  # Misfire codes (P0300-P0312)
-        'P056',  # System voltage issues (P0562, P0563)
-        'P060',  # PCM/ECM memory errors (P0601-P0605)
-        'C000',  # Critical chassis codes (some sensors)
-        'B000',  # Airbag system failures
-    ]
-    
-    # Check for critical patterns
-    for pattern in critical_patterns:
-        if cleaned_code.startswith(pattern):
-            return "Critical"
-    
-    # High priority codes
-    high_priority_codes = [
-        'P0100', 'P0101', 'P0102', 'P0103',  # MAF issues
-        'P0115', 'P0117', 'P0118',          # Coolant temp issues
-        'P0120', 'P0121', 'P0122', 'P0123', # Throttle position issues
-        'P0171', 'P0172', 'P0174', 'P0175', # Fuel trim issues
-        'P0500',                             # Vehicle speed sensor
-    ]
-    
-    if cleaned_code in high_priority_codes:
-        return "High"
-    
-    # Moderate priority codes (emissions, comfort, etc.)
-    moderate_patterns = [
-        'P042',  # Catalyst codes (P0420, P0430)
-        'P044',  # EVAP codes (P0440-P0455)
-        'P013',  # O2 sensor codes (P0130-P0139)
-        'P070',  # Transmission codes
-        'P075',  # Shift solenoid codes
-        'P076',  # Shift solenoid codes
-    ]
-    
-    for pattern in moderate_patterns:
-        if cleaned_code.startswith(pattern):
-            return "Moderate"
-    
-    # Network/Communication issues
-    if cleaned_code.startswith('U'):
-        return "Moderate"
-    
-    # Body system codes (usually low priority unless safety-related)
-    if cleaned_code.startswith('B'):
-        # Airbag codes are critical, others are typically low
-        if cleaned_code.startswith('B000'):
-            return "Critical"
-        return "Low"
-    
-    # Chassis codes (brakes, suspension, etc.)
-    if cleaned_code.startswith('C'):
-        # ABS and brake-related codes are more serious
-        if cleaned_code.startswith('C000') or cleaned_code.startswith('C100'):
-            return "High" 
-        return "Moderate"
-    
-    # Default for P-codes and others
-    return "Low"
+    return SEVERITY_LEVELS[_SEVERITY_TABLE[_pack_code(cleaned_code)]]
 
 def validate_dtc_dataset():
     """Validate the enhanced DTC dataset for format issues"""
-    table = _enhanced_table()
-    invalid_codes = []
-    
-    for code in list(table.keys()):
-        if not _clean_dtc_code(code):
-            invalid_codes.append(code)
+    table, invalid_codes = _load_enhanced()
     
     if invalid_codes:
         print(f"⚠️  Found {len(invalid_codes)} invalid DTC format(s):")
@@ -217,21 +410,18 @@ def validate_dtc_dataset():
 
 def get_dataset_stats():
     """Get statistics about the DTC datasets"""
-    local_count = len(_local_table())
-    enhanced_count = len(_enhanced_table())
+    local = _local_table()
+    enhanced = _enhanced_table()
+    all_codes = local.keys() | enhanced.keys()
     
     stats = {
-        "local_codes": local_count,
-        "enhanced_codes": enhanced_count,
-        "total_unique": len(set(_local_table().keys()) | set(_enhanced_table().keys()))
+        "local_codes": len(local),
+        "enhanced_codes": len(enhanced),
+        "total_unique": len(all_codes)
     }
     
     # Count by prefix
-    all_codes = set(_local_table().keys()) | set(_enhanced_table().keys())
-    prefix_counts = {}
-    for code in all_codes:
-        prefix = code[0] if code else 'Unknown'
-        prefix_counts[prefix] = prefix_counts.get(prefix, 0) + 1
+    prefix_counts = Counter(code[0] if code else 'Unknown' for code in all_codes)
     
     stats["by_system"] = {
         "P (Powertrain)": prefix_counts.get('P', 0),
@@ -1,15 +1,187 @@
 # api/utils/elm327.py
+import asyncio
 import logging
+import os
+import re
+import struct
 import time
 import platform
 import subprocess
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Final, Optional, List, Dict, Any, Tuple
 import serial
 import serial.tools.list_ports
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# DTC system prefix indexed by the top two bits of the first DTC byte
+DTC_TYPE_PREFIXES: Final = ("P", "C", "B", "U")
+
+# ELM327 prints this prompt when it is ready for the next command
+ELM327_PROMPT = b">"
+COMMAND_TIMEOUT = 10  # seconds
+FAST_COMMAND_TIMEOUT = 3  # seconds, used by the production Bluetooth init
+PORT_CACHE_TTL = 5  # seconds to reuse a port enumeration
+BLUETOOTH_SCAN_TIMEOUT = 10  # seconds per platform scan command
+
+# USB adapters that support ATBRD can switch to this rate after reset
+USB_HIGH_SPEED_BAUDRATE = 500000
+ELM327_BAUD_CLOCK = 4000000  # ATBRD divisor base: baud = 4 MHz / divisor
+RESET_COMMANDS = frozenset({"ATZ", "ATWS"})  # Both return the adapter to its default baud rate
+
+# Longest response text written to a log line
+LOG_RESPONSE_LIMIT = 200
+
+def _short(text: str) -> str:
+    """Trim a response for logging so long verbose replies cost O(LOG_RESPONSE_LIMIT) to format"""
+    return text if len(text) <= LOG_RESPONSE_LIMIT else text[:LOG_RESPONSE_LIMIT] + "…"
+
+# Leading run of hex digits in a response line
+_HEX_RUN_RE = re.compile(r'[0-9A-Fa-f]*')
+
+# Mode 01 PID conversions as (scale, offset): value = raw * scale + offset
+# Enhanced formulas based on PyOBD implementation
+PID_FORMULAS: Final = {
+    "0104": (100 / 255, 0),      # Calculated engine load (%)
+    "0105": (1, -40),            # Engine coolant temperature (°C)
+    "0106": (100 / 128, -100),   # Short term fuel trim (%)
+    "0107": (100 / 128, -100),   # Long term fuel trim (%)
+    "010B": (1, 0),              # Intake manifold absolute pressure (kPa)
+    "010C": (1 / 4, 0),          # Engine RPM (2 bytes)
+    "010D": (1, 0),              # Vehicle speed (km/h)
+    "010E": (1 / 2, -64),        # Timing advance (degrees)
+    "010F": (1, -40),            # Intake air temperature (°C)
+    "0110": (1 / 100, 0),        # MAF air flow rate (g/s)
+    "0111": (100 / 255, 0),      # Throttle position (%)
+    "0133": (1 / 200, 0),        # Absolute Barometric Pressure (kPa)
+    "0142": (1 / 1000, 0),       # Control module voltage (V)
+    "0143": (100 / 255, 0),      # Absolute load value (%)
+    "0144": (1 / 32768, 0),      # Fuel/Air commanded ratio
+    "0145": (100 / 255, 0),      # Relative throttle position (%)
+    "0146": (1, -40),            # Ambient air temperature (°C)
+    "0147": (100 / 255, 0),      # Absolute throttle position B (%)
+    "0149": (100 / 255, 0),      # Accelerator pedal position D (%)
+    "014A": (100 / 255, 0),      # Accelerator pedal position E (%)
+    "015C": (1, -40),            # Engine oil temperature (°C)
+}
+
+# Mode 01 requests are batched so the reply fits one CAN frame (mode byte + PID/data pairs)
+MAX_SINGLE_FRAME_BYTES = 7
+
+# Response count suffix: the ELM327 stops listening after one frame instead of waiting out ATST
+SINGLE_FRAME_RESPONSE_COUNT = "1"
+
+# PIDs whose value spans two data bytes (A * 256 + B)
+TWO_BYTE_PIDS: Final = frozenset({"010C", "0110", "0142", "0143", "0144"})
+
+# Data bytes each Mode 01 PID returns, used to split batched responses
+PID_DATA_BYTES: Final = {
+    "0104": 1, "0105": 1, "0106": 1, "0107": 1, "0108": 1, "0109": 1, "010A": 1,
+    "010B": 1, "010C": 2, "010D": 1, "010E": 1, "010F": 1, "0110": 2, "0111": 1,
+    "0114": 2, "0115": 2, "0133": 1, "0142": 2, "0143": 2, "0144": 2, "0145": 1,
+    "0146": 1, "0147": 1, "0149": 1, "014A": 1, "015C": 1,
+}
+
+PID_UNITS: Final = {
+    "0104": "%",         # Calculated engine load
+    "0105": "°C",        # Engine coolant temperature
+    "0106": "%",         # Short term fuel trim
+    "0107": "%",         # Long term fuel trim
+    "010B": "kPa",       # Intake manifold absolute pressure
+    "010C": "RPM",       # Engine RPM
+    "010D": "km/h",      # Vehicle speed
+    "010E": "degrees",   # Timing advance
+    "010F": "°C",        # Intake air temperature
+    "0110": "g/s",       # MAF air flow rate
+    "0111": "%",         # Throttle position
+    "0133": "kPa",       # Absolute Barometric Pressure
+    "0142": "V",         # Control module voltage
+    "0143": "%",         # Absolute load value
+    "0144": "ratio",     # Fuel/Air commanded ratio
+    "0145": "%",         # Relative throttle position
+    "0146": "°C",        # Ambient air temperature
+    "0147": "%",         # Absolute throttle position B
+    "0149": "%",         # Accelerator pedal position D
+    "014A": "%",         # Accelerator pedal position E
+    "015C": "°C",        # Engine oil temperature
+}
+
+PID_DESCRIPTIONS: Final = {
+    "0104": "Calculated Engine Load",
+    "0105": "Engine Coolant Temperature",
+    "0106": "Short Term Fuel Trim Bank 1",
+    "0107": "Long Term Fuel Trim Bank 1",
+    "010B": "Intake Manifold Absolute Pressure",
+    "010C": "Engine RPM",
+    "010D": "Vehicle Speed",
+    "010E": "Timing Advance",
+    "010F": "Intake Air Temperature",
+    "0110": "MAF Air Flow Rate",
+    "0111": "Throttle Position",
+    "0133": "Absolute Barometric Pressure",
+    "0142": "Control Module Voltage",
+    "0143": "Absolute Load Value",
+    "0144": "Fuel/Air Commanded Equivalence Ratio",
+    "0145": "Relative Throttle Position",
+    "0146": "Ambient Air Temperature",
+    "0147": "Absolute Throttle Position B",
+    "0149": "Accelerator Pedal Position D",
+    "014A": "Accelerator Pedal Position E",
+    "015C": "Engine Oil Temperature",
+}
+
+# Everything a reading needs per PID: (scale, offset, unit, description)
+PID_INFO: Final = {
+    pid: (*PID_FORMULAS.get(pid, (1, 0)), PID_UNITS.get(pid, ""), PID_DESCRIPTIONS.get(pid, f"PID {pid}"))
+    for pid in PID_FORMULAS.keys() | PID_UNITS.keys() | PID_DESCRIPTIONS.keys()
+}
+
+# Fixed commands sent on every connection or scan, plus single-PID Mode 01 requests
+ELM327_FIXED_COMMANDS: Final = (
+    "ATZ", "ATE0", "ATL0", "ATH1", "ATS0", "ATM0", "ATSP0", "ATAL",
+    "ATAT1", "ATAT2", "ATST19", "ATST64", "0100", "0101", "03", "07", "0A", "0902", "0904",
+)
+
+# Wire bytes for known commands so the polling path skips the per-call encode
+COMMAND_BYTES: Final = {
+    command: f"{command}\r".encode()
+    for command in (*ELM327_FIXED_COMMANDS, *(pid + SINGLE_FRAME_RESPONSE_COUNT for pid in PID_INFO))
+}
+
+# Live parameter PIDs read for each scan type
+QUICK_SCAN_PIDS: Final = ("010C", "010D", "0105", "010F")  # RPM, Speed, Coolant temp, Intake temp
+EMISSIONS_SCAN_PIDS: Final = ("010C", "010D", "0105", "0106", "0107", "0108", "0109", "010A", "010B")
+COMPREHENSIVE_SCAN_PIDS: Final = (
+    "010C", "010D", "0105", "010F", "0111", "0104", "0106", "0107",
+    "0108", "0109", "010A", "010B", "0110", "0114", "0115", "0142"
+)
+
+# Readiness monitors by bit position in bytes B/C of Mode 01 PID 01 (gasoline vehicles)
+READINESS_MONITOR_NAMES: Final = (
+    "Misfire", "Fuel System", "Components", "Reserved",
+    "Catalyst", "Heated Catalyst", "Evap System", "Secondary Air"
+)
+
+# Name fragments that identify OBD2 adapters
+OBD2_KEYWORDS: Final = ("obd", "elm327", "elm", "obdii", "diagnostic", "scanner")
+OBD2_USB_KEYWORDS: Final = OBD2_KEYWORDS + ("ch340", "ftdi")
+OBD2_DEVICE_NAME_KEYWORDS: Final = OBD2_KEYWORDS + ("torque", "car", "auto", "vehicle", "ecu", "canbus")
+BLUETOOTH_PORT_INDICATORS: Final = (
+    "bluetooth", "bt", "rfcomm", "/dev/cu.bluetooth",
+    "/dev/tty.bluetooth", "com", "tty.", "obdii", "obd"
+)
+
+def _keyword_pattern(keywords) -> "re.Pattern":
+    """Compile keywords into one case-insensitive alternation"""
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+_OBD2_RE = _keyword_pattern(OBD2_KEYWORDS)
+_OBD2_USB_RE = _keyword_pattern(OBD2_USB_KEYWORDS)
+_OBD2_DEVICE_NAME_RE = _keyword_pattern(OBD2_DEVICE_NAME_KEYWORDS)
+_BLUETOOTH_PORT_RE = _keyword_pattern(BLUETOOTH_PORT_INDICATORS)
+
 @dataclass
 class OBD2Data:
     """Data structure for OBD2 sensor readings"""
@@ -21,14 +193,54 @@ class OBD2Data:
 class ELM327Scanner:
     """ELM327 OBD2 Scanner communication handler"""
     
+    # Shared (timestamp, ports) from the last enumeration
+    _port_cache: Optional[Tuple[float, List[Dict[str, str]]]] = None
+    
+    # Port of the last successful connection, tried first when no port is given
+    _last_connected_port: Optional[str] = None
+    
     def __init__(self, port: Optional[str] = None, baudrate: int = 38400):
         self.port = port
         self.baudrate = baudrate
         self.serial_conn: Optional[serial.Serial] = None
         self.connected = False
+        self._awaiting_prompt = True  # Input may hold a partial reply; clear it before the next command
+        self._rx_pending = b""  # Bytes read past the last prompt (pipelined replies)
+        self._fd: Optional[int] = None  # Raw POSIX descriptor for command writes
+        self._trace = False  # Per-command debug logging, decided once per connection
+        # One worker for the scanner's whole lifetime keeps every serial call in order
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="elm327-io")
+    
+    async def run_io(self, func, *args):
+        """Run a blocking scanner call on this scanner's serial I/O thread and await the result"""
+        # A single worker keeps commands in order and off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, partial(func, *args))
         
-    def list_available_ports(self) -> List[Dict[str, str]]:
+    async def list_available_ports(self) -> List[Dict[str, str]]:
         """List available serial ports for OBD2 scanners"""
+        # Enumeration runs Bluetooth scan subprocesses, so reuse a recent result
+        cached = self._cached_ports()
+        if cached is not None:
+            return cached
+        
+        ports = self._list_serial_ports()
+        
+        # Add platform-specific Bluetooth scanning
+        ports.extend(await self._scan_bluetooth_obd2_devices())
+        
+        ELM327Scanner._port_cache = (time.time(), ports)
+        return list(ports)
+    
+    def _cached_ports(self) -> Optional[List[Dict[str, str]]]:
+        """Return a copy of the last enumeration if it is still fresh"""
+        cached = ELM327Scanner._port_cache
+        if cached and time.time() - cached[0] < PORT_CACHE_TTL:
+            return list(cached[1])
+        return None
+    
+    def _list_serial_ports(self) -> List[Dict[str, str]]:
+        """Enumerate local serial ports and classify their connection type"""
         ports = []
         for port in serial.tools.list_ports.comports():
             port_info = {
@@ -38,25 +250,22 @@ class ELM327Scanner:
                 "connection_type": "unknown"
             }
             
-            # Detect connection type
-            desc_lower = port.description.lower()
+            # Detect connection type (some platforms report no description)
+            desc_lower = (port.description or "").lower()
+            device_lower = (port.device or "").lower()
             if ("bluetooth" in desc_lower or "bt" in desc_lower or "rfcomm" in desc_lower or 
-                "obdii" in port.device.lower() or "obd" in port.device.lower()):
+                "obd" in device_lower):
                 port_info["connection_type"] = "bluetooth"
-                port_info["is_obd2_compatible"] = str(self._is_obd2_bluetooth_device(port))
+                port_info["is_obd2_compatible"] = "true" if self._is_obd2_bluetooth(desc_lower, device_lower) else "false"
             elif "usb" in desc_lower or "serial" in desc_lower:
                 port_info["connection_type"] = "usb"
-                port_info["is_obd2_compatible"] = str(self._is_obd2_usb_device(port))
+                port_info["is_obd2_compatible"] = "true" if self._is_obd2_usb(desc_lower) else "false"
             else:
                 port_info["is_obd2_compatible"] = "false"
             
             # Include all ports but mark OBD2 compatibility
             ports.append(port_info)
         
-        # Add platform-specific Bluetooth scanning
-        bluetooth_ports = self._scan_bluetooth_obd2_devices()
-        ports.extend(bluetooth_ports)
-        
         return ports
     
     def connect(self, port: Optional[str] = None) -> bool:
@@ -64,9 +273,15 @@ class ELM327Scanner:
         try:
             if port:
                 self.port = port
+            
+            if not self.port:
+                self.port = ELM327Scanner._last_connected_port
                 
             if not self.port:
-                available_ports = self.list_available_ports()
+                # Bluetooth scans are async; use the last full listing or local serial ports
+                available_ports = self._cached_ports()
+                if available_ports is None:
+                    available_ports = self._list_serial_ports()
                 # Prefer OBD2-compatible ports
                 obd2_ports = [p for p in available_ports if p.get("is_obd2_compatible", "false") == "true"]
                 if obd2_ports:
@@ -93,6 +308,11 @@ class ELM327Scanner:
                 write_timeout=write_timeout
             )
             
+            self._awaiting_prompt = True
+            self._rx_pending = b""
+            self._fd = self.serial_conn.fileno() if os.name == "posix" else None
+            self._trace = logger.isEnabledFor(logging.DEBUG)
+            self._enable_low_latency()
             logger.info(f"Serial connection established to {self.port}")
             
             # Set connected to True before initialization so commands work
@@ -106,146 +326,203 @@ class ELM327Scanner:
             else:
                 self._initialize_usb_connection()
             
+            ELM327Scanner._last_connected_port = self.port
             logger.info(f"Connected to ELM327 scanner on {self.port} ({'Bluetooth' if is_bluetooth else 'USB'})")
             return True
             
         except Exception as e:
             logger.error(f"Failed to connect to ELM327: {e}")
             self.connected = False
-            if self.serial_conn and self.serial_conn.is_open:
-                self.serial_conn.close()
+            ELM327Scanner._port_cache = None  # The port list may be stale
+            if self.port == ELM327Scanner._last_connected_port:
+                ELM327Scanner._last_connected_port = None  # Enumerate again next time
+            self._close_serial()
+            self._fd = None
             return False
     
+    def _close_serial(self):
+        """Close the port, first resetting an adapter left at an ATBRD-switched rate"""
+        if not (self.serial_conn and self.serial_conn.is_open):
+            return
+        # The next connect opens at the configured rate and expects the adapter there too
+        if self.serial_conn.baudrate != self.baudrate:
+            try:
+                self._write_bytes(COMMAND_BYTES["ATZ"])
+                self.serial_conn.flush()
+            except (serial.SerialException, OSError) as e:
+                logger.debug(f"Could not reset adapter baud rate: {e}")
+        self.serial_conn.close()
+    
+    def _enable_low_latency(self):
+        """Ask the serial driver to deliver bytes without its 16 ms batching delay"""
+        if platform.system() != "Linux":
+            return
+        try:
+            # Sets ASYNC_LOW_LATENCY through TIOCSSERIAL
+            self.serial_conn.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, OSError, ValueError) as e:
+            logger.debug(f"Low latency mode unavailable on {self.port}: {e}")
+    
     def disconnect(self):
         """Disconnect from ELM327 scanner"""
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
+        self._close_serial()
         self.connected = False
+        self._fd = None
         logger.info("Disconnected from ELM327 scanner")
     
+    def close(self):
+        """Stop the I/O thread once calls already queued have run; the scanner is not reused after this"""
+        self._io_executor.shutdown(wait=False)
+    
     def _send_command(self, command: str) -> str:
         """Send command to ELM327 and get response"""
         if not self.connected or not self.serial_conn:
             raise ConnectionError("Not connected to ELM327 scanner")
         
-        logger.debug(f"Sending command: {command}")
+        self._write_command(command)
+        final_response = self._read_response(COMMAND_TIMEOUT)
         
-        # Clear buffer
-        self.serial_conn.reset_input_buffer()
+        if self._trace:
+            logger.debug("%s -> %r", command, _short(final_response))
+        return final_response
+    
+    def _write_command(self, command: str):
+        """Write a command, discarding stale input only if the last reply was cut short"""
+        # Every complete reply ends at the prompt, so the buffer is already empty
+        if self._awaiting_prompt:
+            self._discard_input()
         
-        # Send command
-        cmd = f"{command}\r".encode()
-        self.serial_conn.write(cmd)
+        payload = COMMAND_BYTES.get(command)
+        if payload is None:
+            payload = f"{command}\r".encode()
+        self._write_bytes(payload)
+        self._awaiting_prompt = True
+        if command.strip().upper() in RESET_COMMANDS:
+            self._restore_default_baudrate()
+    
+    def _restore_default_baudrate(self):
+        """Follow an adapter reset back to the configured rate if ATBRD had switched the link"""
+        if self.serial_conn.baudrate != self.baudrate:
+            self.serial_conn.flush()  # The reset command must leave at the switched rate
+            self.serial_conn.baudrate = self.baudrate
+    
+    def _write_bytes(self, payload: bytes):
+        """Write a short command straight to the fd, skipping pyserial's write loop and tcdrain"""
+        # The following read waits for the reply anyway, so there is no need to drain TX first
+        if self._fd is not None:
+            try:
+                while payload:
+                    payload = payload[os.write(self._fd, payload):]
+                return
+            except BlockingIOError:
+                pass  # Kernel buffer full; let pyserial wait for room
+        self.serial_conn.write(payload)
         self.serial_conn.flush()  # Ensure data is sent
+    
+    def _read_response(self, max_timeout: float) -> str:
+        """Read a reply up to the prompt and return its non-empty lines joined by newlines"""
+        raw = self._read_until_prompt(max_timeout)
         
-        # Read response with improved timeout handling
-        response = ""
-        start_time = time.time()
-        max_timeout = 10  # 10 second maximum timeout
+        # ELM327 separates lines with \r (\r\n with linefeeds on)
+        lines = raw.decode('utf-8', errors='ignore').replace('\r', '\n').split('\n')
+        response = "\n".join(line.strip() for line in lines if line.strip())
+        return response.rstrip('>').strip()
+    
+    def _read_until_prompt(self, max_timeout: float) -> bytes:
+        """Read until the ELM327 '>' prompt or max_timeout seconds elapse"""
+        buf = bytearray(self._rx_pending)
+        self._rx_pending = b""
+        deadline = time.time() + max_timeout
+        scanned = 0
+        while True:
+            # Only the bytes added since the last pass can hold the prompt
+            end = buf.find(ELM327_PROMPT, scanned)
+            if end >= 0:
+                # Keep anything after the prompt for the next pipelined reply
+                self._rx_pending = bytes(buf[end + 1:])
+                self._awaiting_prompt = False
+                return bytes(buf[:end + 1])
+            if time.time() >= deadline:
+                return bytes(buf)
+            scanned = len(buf)
+            # Block (select-based in pyserial) for one byte, then drain what has arrived in one call
+            buf += self.serial_conn.read(self.serial_conn.in_waiting or 1)
+    
+    def send_raw_command(self, payload: bytes, max_timeout: float = FAST_COMMAND_TIMEOUT) -> Tuple[int, bytes]:
+        """Write payload exactly as given and return (bytes written, raw reply up to the prompt)"""
+        # For debugging line endings; runs on the I/O thread like any other command
+        if not self.connected or not self.serial_conn:
+            raise ConnectionError("Not connected to ELM327 scanner")
         
-        while (time.time() - start_time) < max_timeout:
-            if self.serial_conn.in_waiting > 0:
-                try:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        response += line + "\n"
-                        logger.debug(f"Received line: {repr(line)}")
-                        if ">" in line:  # ELM327 prompt indicates end
-                            break
-                        if line.endswith(">"):  # Sometimes prompt is at end of data
-                            break
-                except Exception as read_error:
-                    logger.warning(f"Error reading response: {read_error}")
-                    break
-            else:
-                time.sleep(0.1)
+        self._discard_input()
+        self.serial_conn.reset_output_buffer()
+        bytes_written = self.serial_conn.write(payload)
+        self.serial_conn.flush()
+        self._awaiting_prompt = True
         
-        final_response = response.strip()
-        logger.debug(f"Final response for {command}: {repr(final_response)}")
-        return final_response
+        # The adapter only acts on a command once it sees the carriage return
+        command, terminated, _ = payload.partition(b"\r")
+        if terminated and command.decode("ascii", errors="ignore").strip().upper() in RESET_COMMANDS:
+            self._restore_default_baudrate()
+        
+        return bytes_written, self._read_until_prompt(max_timeout)
+    
+    def _discard_input(self):
+        """Drop unread input, including bytes held back from a previous read"""
+        self.serial_conn.reset_input_buffer()
+        self._rx_pending = b""
     
     def get_dtc_codes(self) -> List[str]:
         """Get Diagnostic Trouble Codes"""
         try:
             response = self._send_command("03")  # Get DTCs
-            codes = []
             
-            # Parse CAN format response like in the log
-            lines = response.split('\n')
-            for line in lines:
-                # Look for CAN responses containing DTC data
-                if "43" in line and len(line) > 10:  # Mode 3 response
-                    # Handle CAN format: 7E8100E4306D1200013
-                    # Extract the data portion after header
-                    line_clean = line.strip()
-                    
-                    # Find the "43" (Mode 3 response) and extract data after it
-                    mode3_pos = line_clean.find("43")
-                    if mode3_pos >= 0:
-                        # Extract data after "43"
-                        dtc_data = line_clean[mode3_pos + 2:]
-                        
-                        # Parse DTC codes from the hex data
-                        # DTCs are encoded as 2-byte pairs
-                        for i in range(0, len(dtc_data) - 3, 4):
-                            if i + 4 <= len(dtc_data):
-                                try:
-                                    first_byte = dtc_data[i:i+2]
-                                    second_byte = dtc_data[i+2:i+4]
-                                    
-                                    # Skip if all zeros (no more DTCs)
-                                    if first_byte == "00" and second_byte == "00":
-                                        break
-                                        
-                                    code = self._parse_dtc(first_byte, second_byte)
-                                    if code and code not in codes:
-                                        codes.append(code)
-                                except Exception as parse_error:
-                                    logger.debug(f"Error parsing DTC bytes: {parse_error}")
-                                    continue
-            
-            return codes
+            # Parse CAN format response like 7E8100E4306D1200013 (Mode 3 response)
+            return self._parse_dtc_response(response, "43")
             
         except Exception as e:
             logger.error(f"Error getting DTC codes: {e}")
             return []
     
-    def _parse_dtc(self, first_byte: str, second_byte: str) -> Optional[str]:
-        """Parse DTC from two bytes"""
-        try:
-            # Convert hex to binary
-            first = int(first_byte, 16)
-            second = int(second_byte, 16)
-            
-            # Extract DTC type and code
-            dtc_type = (first & 0xC0) >> 6
-            code = ((first & 0x3F) << 8) | second
-            
-            # Map DTC type to prefix
-            type_map = {0: "P", 1: "C", 2: "B", 3: "U"}
-            prefix = type_map.get(dtc_type, "P")
+    def _parse_dtc_response(self, response: str, mode_marker: str) -> List[str]:
+        """Parse DTC codes from a Mode 03/07/0A response"""
+        codes = []
+        seen = set()
+        for line in response.split('\n'):
+            if mode_marker not in line or len(line) <= 10:
+                continue
             
-            return f"{prefix}{code:04X}"
+            # Extract the hex data after the mode response byte
+            line_clean = line.strip().replace(" ", "")
+            mode_pos = line_clean.find(mode_marker)
+            if mode_pos < 0:
+                continue
+            dtc_data = _HEX_RUN_RE.match(line_clean, mode_pos + 2).group()
             
-        except Exception as e:
-            logger.error(f"Error parsing DTC: {e}")
-            return None
+            # DTCs are encoded as big-endian 16-bit words; decode the whole payload at once
+            raw = bytes.fromhex(dtc_data[:len(dtc_data) - len(dtc_data) % 4])
+            for (word,) in struct.iter_unpack(">H", raw):
+                # Skip if all zeros (no more DTCs)
+                if not word:
+                    break
+                
+                # Top two bits select the system, the remaining 14 bits are the code number
+                code = f"{DTC_TYPE_PREFIXES[word >> 14]}{word & 0x3FFF:04X}"
+                if code not in seen:
+                    seen.add(code)
+                    codes.append(code)
+        return codes
     
     def get_sensor_data(self, pid: str) -> Optional[OBD2Data]:
         """Get sensor data for specific PID"""
         try:
-            response = self._send_command(pid)
+            response = self._send_command(self._mode01_request(pid))
             
             # Parse response based on PID
             if response and not response.startswith("NO DATA"):
-                value = self._parse_sensor_value(pid, response)
-                if value is not None:
-                    return OBD2Data(
-                        pid=pid,
-                        value=value,
-                        unit=self._get_pid_unit(pid),
-                        description=self._get_pid_description(pid)
-                    )
+                raw_value = self._parse_raw_value(pid, response)
+                if raw_value is not None:
+                    return self._make_reading(pid, raw_value)
             
             return None
             
@@ -253,31 +530,108 @@ class ELM327Scanner:
             logger.error(f"Error getting sensor data for PID {pid}: {e}")
             return None
     
-    def _parse_sensor_value(self, pid: str, response: str) -> Optional[float]:
-        """Parse sensor value from response"""
+    def get_multiple_sensor_data(self, pids: List[str]) -> Dict[str, OBD2Data]:
+        """Get sensor data for several PIDs, batching Mode 01 requests where possible"""
+        results = {}
+        batch = []
+        batch_size = 1  # Response bytes so far, starting with the 0x41 mode byte
+        
+        for pid in pids:
+            # Only PIDs with a known data length can be split out of a shared response
+            data_bytes = PID_DATA_BYTES.get(pid)
+            if not data_bytes:
+                sensor = self.get_sensor_data(pid)
+                if sensor:
+                    results[pid] = sensor
+                continue
+            
+            # Keep each batch within a single CAN frame (7 data bytes)
+            pid_size = 1 + data_bytes
+            if batch and batch_size + pid_size > MAX_SINGLE_FRAME_BYTES:
+                results.update(self._read_pid_batch(batch))
+                batch, batch_size = [], 1
+            batch.append(pid)
+            batch_size += pid_size
+        
+        if batch:
+            results.update(self._read_pid_batch(batch))
+        
+        # Preserve the caller's PID order
+        return {pid: results[pid] for pid in pids if pid in results}
+    
+    def _read_pid_batch(self, pids: List[str]) -> Dict[str, OBD2Data]:
+        """Send one Mode 01 request for a batch of PIDs"""
+        if len(pids) == 1:
+            sensor = self.get_sensor_data(pids[0])
+            return {pids[0]: sensor} if sensor else {}
+        
         try:
-            # Extract data bytes from response - handle CAN format
-            lines = response.split('\n')
-            for line in lines:
-                # Handle CAN format like "7E8064100BFBEB993"
-                if "41" in line:  # Response to Mode 01 request
-                    # Find the PID in the response
-                    if pid[2:4] in line:  # Look for PID (e.g., "05" for 0105)
-                        # Extract the data portion after the PID
-                        can_data = line.strip()
-                        
-                        # For CAN format: 7E8 06 41 05 XX (where XX is the data)
-                        # Find position of PID and extract data after it
-                        pid_pos = can_data.find("41" + pid[2:4])
-                        if pid_pos >= 0:
-                            data_start = pid_pos + 4  # Skip "41" + PID
-                            if data_start + 2 <= len(can_data):
-                                # Extract the data bytes
-                                data_hex = can_data[data_start:data_start + 2]
-                                value = int(data_hex, 16)
-                                
-                                # Apply formula based on PID
-                                return self._apply_pid_formula(pid, value)
+            response = self._send_command(self._mode01_request("01" + "".join(pid[2:4] for pid in pids)))
+            values = self._parse_multi_pid_response(response, set(pids))
+        except Exception as e:
+            logger.error(f"Error getting sensor data for PIDs {pids}: {e}")
+            values = {}
+        
+        results = {}
+        for pid in pids:
+            if pid in values:
+                results[pid] = self._make_reading(pid, values[pid])
+            else:
+                # Some ECUs reject multi-PID requests; fall back to a single read
+                sensor = self.get_sensor_data(pid)
+                if sensor:
+                    results[pid] = sensor
+        return results
+    
+    def _mode01_request(self, command: str) -> str:
+        """Append the expected response count so the ELM327 returns after one frame"""
+        if command.startswith("01") and len(command) >= 4:
+            return command + SINGLE_FRAME_RESPONSE_COUNT
+        return command
+    
+    def _parse_multi_pid_response(self, response: str, pids: set) -> Dict[str, int]:
+        """Parse raw values from a '41 PID DATA PID DATA ...' response"""
+        values = {}
+        for line in response.split('\n'):
+            can_data = line.strip().replace(" ", "")
+            mode_pos = can_data.find("41")
+            if mode_pos < 0:
+                continue
+            hex_data = _HEX_RUN_RE.match(can_data, mode_pos + 2).group()
+            raw = bytes.fromhex(hex_data[:len(hex_data) - len(hex_data) % 2])
+            
+            # Walk PID byte, then its data bytes; the value uses the leading one or two of them
+            i = 0
+            while i < len(raw):
+                pid = f"01{raw[i]:02X}"
+                data_bytes = PID_DATA_BYTES.get(pid, 0)
+                if pid not in pids or i + 1 + data_bytes > len(raw):
+                    break
+                value_bytes = 2 if pid in TWO_BYTE_PIDS else 1
+                values.setdefault(pid, int.from_bytes(raw[i + 1:i + 1 + value_bytes], 'big'))
+                i += 1 + data_bytes
+        return values
+    
+    def _parse_raw_value(self, pid: str, response: str) -> Optional[int]:
+        """Extract the raw data value for a PID from a Mode 01 response"""
+        try:
+            # Response to Mode 01 request: "41" + PID, then the data bytes
+            marker = "41" + pid[2:4]
+            byte_count = 2 if pid in TWO_BYTE_PIDS else 1
+            
+            # Extract data bytes from response - handle CAN format like "7E8064100BFBEB993"
+            for line in response.split('\n'):
+                can_data = line.strip().replace(" ", "")
+                pid_pos = can_data.find(marker)
+                if pid_pos < 0:
+                    continue
+                
+                # Decode the data bytes after "41" + PID in one call
+                data_start = pid_pos + 4
+                data_hex = can_data[data_start:data_start + 2 * byte_count]
+                if len(data_hex) < 2 * byte_count:
+                    continue
+                return int.from_bytes(bytes.fromhex(data_hex), 'big')
             
             return None
             
@@ -285,90 +639,23 @@ class ELM327Scanner:
             logger.error(f"Error parsing sensor value: {e}")
             return None
     
+    def _make_reading(self, pid: str, raw_value: int) -> OBD2Data:
+        """Build a converted reading with one lookup in the precomputed PID table"""
+        scale, offset, unit, description = PID_INFO.get(pid) or (1, 0, "", f"PID {pid}")
+        return OBD2Data(pid=pid, value=raw_value * scale + offset, unit=unit, description=description)
+    
     def _apply_pid_formula(self, pid: str, raw_value: int, data_bytes: List[int] = None) -> float:
         """Apply formula to convert raw value to actual reading"""
-        # Enhanced formulas based on PyOBD implementation
-        formulas = {
-            "0105": lambda x: x - 40,      # Engine coolant temperature (°C)
-            "010C": lambda x: ((x >> 8) * 256 + (x & 0xFF)) / 4,  # Engine RPM (2 bytes)
-            "010D": lambda x: x,           # Vehicle speed (km/h)
-            "010F": lambda x: x - 40,      # Intake air temperature (°C)
-            "0111": lambda x: x * 100 / 255,  # Throttle position (%)
-            "0104": lambda x: x * 100 / 255,  # Calculated engine load (%)
-            "0106": lambda x: (x - 128) * 100 / 128,  # Short term fuel trim (%)
-            "0107": lambda x: (x - 128) * 100 / 128,  # Long term fuel trim (%)
-            "010B": lambda x: x,           # Intake manifold absolute pressure (kPa)
-            "010E": lambda x: (x - 128) / 2,  # Timing advance (degrees)
-            "010F": lambda x: x - 40,      # Intake air temperature (°C)
-            "0110": lambda x: ((x >> 8) * 256 + (x & 0xFF)) / 100,  # MAF air flow rate (g/s)
-            "0133": lambda x: x / 200,     # Absolute Barometric Pressure (kPa)
-            "0142": lambda x: ((x >> 8) * 256 + (x & 0xFF)) / 1000,  # Control module voltage (V)
-            "0143": lambda x: ((x >> 8) * 256 + (x & 0xFF)) * 100 / 255,  # Absolute load value (%)
-            "0144": lambda x: ((x >> 8) * 256 + (x & 0xFF)) / 32768,  # Fuel/Air commanded ratio
-            "0145": lambda x: x * 100 / 255,  # Relative throttle position (%)
-            "0146": lambda x: x - 40,      # Ambient air temperature (°C)
-            "0147": lambda x: x * 100 / 255,  # Absolute throttle position B (%)
-            "0149": lambda x: x * 100 / 255,  # Accelerator pedal position D (%)
-            "014A": lambda x: x * 100 / 255,  # Accelerator pedal position E (%)
-            "015C": lambda x: x - 40,      # Engine oil temperature (°C)
-        }
-        
-        formula = formulas.get(pid, lambda x: x)
-        return formula(raw_value)
+        scale, offset = PID_FORMULAS.get(pid, (1, 0))
+        return raw_value * scale + offset
     
     def _get_pid_unit(self, pid: str) -> str:
         """Get unit for PID"""
-        units = {
-            "0104": "%",         # Calculated engine load
-            "0105": "°C",        # Engine coolant temperature
-            "0106": "%",         # Short term fuel trim
-            "0107": "%",         # Long term fuel trim
-            "010B": "kPa",       # Intake manifold absolute pressure
-            "010C": "RPM",       # Engine RPM
-            "010D": "km/h",      # Vehicle speed
-            "010E": "degrees",   # Timing advance
-            "010F": "°C",        # Intake air temperature
-            "0110": "g/s",       # MAF air flow rate
-            "0111": "%",         # Throttle position
-            "0133": "kPa",       # Absolute Barometric Pressure
-            "0142": "V",         # Control module voltage
-            "0143": "%",         # Absolute load value
-            "0144": "ratio",     # Fuel/Air commanded ratio
-            "0145": "%",         # Relative throttle position
-            "0146": "°C",        # Ambient air temperature
-            "0147": "%",         # Absolute throttle position B
-            "0149": "%",         # Accelerator pedal position D
-            "014A": "%",         # Accelerator pedal position E
-            "015C": "°C",        # Engine oil temperature
-        }
-        return units.get(pid, "")
+        return PID_UNITS.get(pid, "")
     
     def _get_pid_description(self, pid: str) -> str:
         """Get description for PID"""
-        descriptions = {
-            "0104": "Calculated Engine Load",
-            "0105": "Engine Coolant Temperature",
-            "0106": "Short Term Fuel Trim Bank 1",
-            "0107": "Long Term Fuel Trim Bank 1",
-            "010B": "Intake Manifold Absolute Pressure",
-            "010C": "Engine RPM",
-            "010D": "Vehicle Speed",
-            "010E": "Timing Advance",
-            "010F": "Intake Air Temperature",
-            "0110": "MAF Air Flow Rate",
-            "0111": "Throttle Position",
-            "0133": "Absolute Barometric Pressure",
-            "0142": "Control Module Voltage",
-            "0143": "Absolute Load Value",
-            "0144": "Fuel/Air Commanded Equivalence Ratio",
-            "0145": "Relative Throttle Position",
-            "0146": "Ambient Air Temperature",
-            "0147": "Absolute Throttle Position B",
-            "0149": "Accelerator Pedal Position D",
-            "014A": "Accelerator Pedal Position E",
-            "015C": "Engine Oil Temperature",
-        }
-        return descriptions.get(pid, f"PID {pid}")
+        return PID_DESCRIPTIONS.get(pid, f"PID {pid}")
     
     def get_vehicle_info(self) -> Dict[str, Any]:
         """Get basic vehicle information"""
@@ -378,7 +665,9 @@ class ELM327Scanner:
             # Get VIN
             vin_response = self._send_command("0902")
             if vin_response and not vin_response.startswith("NO DATA"):
-                info["vin"] = self._parse_vin(vin_response)
+                vin = self._parse_vin(vin_response)
+                if vin:
+                    info["vin"] = vin
             
             # Get calibration IDs
             cal_response = self._send_command("0904")
@@ -391,22 +680,27 @@ class ELM327Scanner:
             logger.error(f"Error getting vehicle info: {e}")
             return {}
     
-    def _parse_vin(self, response: str) -> str:
-        """Parse VIN from response"""
-        try:
-            # Extract VIN data from response
-            lines = response.split('\n')
-            for line in lines:
-                if line.startswith('49'):
-                    data = line.split()[1:]  # Skip '49'
-                    vin_hex = ''.join(data)
-                    # Convert hex to ASCII
-                    vin = bytes.fromhex(vin_hex).decode('ascii')
-                    return vin.strip()
-            return ""
-        except Exception as e:
-            logger.error(f"Error parsing VIN: {e}")
-            return ""
+    def _parse_vin(self, response: str) -> Optional[str]:
+        """Parse a 17-character VIN from a Mode 09 PID 02 response, or None if incomplete"""
+        # Each frame is "49 02 NN <data>": skip the mode, PID and frame counter, keep the data
+        vin_bytes = bytearray()
+        for line in response.split('\n'):
+            parts = line.split()
+            for i in range(len(parts) - 2):
+                if parts[i] == "49" and parts[i + 1] == "02":
+                    try:
+                        vin_bytes += bytes.fromhex(''.join(parts[i + 3:]))
+                    except ValueError:
+                        pass
+                    break
+        
+        # Decode once, then drop padding and anything else that is not a VIN character
+        vin = ''.join(c for c in vin_bytes.decode('ascii', errors='ignore') if c.isalnum())
+        if len(vin) >= 17:
+            return vin[:17]  # VIN is exactly 17 characters
+        
+        logger.warning(f"Invalid VIN length: {len(vin)}")
+        return None
     
     def _parse_calibration_ids(self, response: str) -> List[str]:
         """Parse calibration IDs from response"""
@@ -415,42 +709,24 @@ class ELM327Scanner:
             lines = response.split('\n')
             for line in lines:
                 if line.startswith('49'):
-                    data = line.split()[1:]
                     # Convert hex to ASCII
-                    cal_id = bytes.fromhex(''.join(data)).decode('ascii')
-                    ids.append(cal_id.strip())
+                    cal_id = bytes.fromhex(''.join(line.split()[1:])).decode('ascii', errors='ignore')
+                    ids.append(cal_id.strip('\x00 '))
             return ids
         except Exception as e:
             logger.error(f"Error parsing calibration IDs: {e}")
             return []
     
-    def _is_obd2_bluetooth_device(self, port) -> bool:
+    def _is_obd2_bluetooth(self, desc_lower: str, device_lower: str) -> bool:
         """Check if Bluetooth device is likely an OBD2 scanner"""
-        # Check description
-        desc_lower = port.description.lower() if port.description else ""
-        
-        # Check device name/port
-        port_lower = port.device.lower() if port.device else ""
-        
-        obd2_keywords = ["obd", "elm327", "elm", "obdii", "diagnostic", "scanner"]
-        
-        # Check both description and port name
-        desc_match = any(keyword in desc_lower for keyword in obd2_keywords)
-        port_match = any(keyword in port_lower for keyword in obd2_keywords)
-        
-        # Special case: if port is "/dev/cu.OBDII", it's definitely OBD2
-        if "obdii" in port_lower or "obd2" in port_lower:
-            return True
-            
-        return desc_match or port_match
+        # Check both description and port name ("obd" also covers "/dev/cu.OBDII")
+        return bool(_OBD2_RE.search(desc_lower) or _OBD2_RE.search(device_lower))
     
-    def _is_obd2_usb_device(self, port) -> bool:
+    def _is_obd2_usb(self, desc_lower: str) -> bool:
         """Check if USB device is likely an OBD2 scanner"""
-        desc_lower = port.description.lower()
-        obd2_keywords = ["obd", "elm327", "elm", "obdii", "diagnostic", "scanner", "ch340", "ftdi"]
-        return any(keyword in desc_lower for keyword in obd2_keywords)
+        return bool(_OBD2_USB_RE.search(desc_lower))
     
-    def _scan_bluetooth_obd2_devices(self) -> List[Dict[str, str]]:
+    async def _scan_bluetooth_obd2_devices(self) -> List[Dict[str, str]]:
         """Scan for paired Bluetooth OBD2 devices"""
         bluetooth_devices = []
         
@@ -458,32 +734,45 @@ class ELM327Scanner:
             system = platform.system()
             
             if system == "Darwin":  # macOS
-                bluetooth_devices = self._scan_bluetooth_macos()
+                bluetooth_devices = await self._scan_bluetooth_macos()
             elif system == "Linux":
-                bluetooth_devices = self._scan_bluetooth_linux()
+                bluetooth_devices = await self._scan_bluetooth_linux()
             elif system == "Windows":
-                bluetooth_devices = self._scan_bluetooth_windows()
+                bluetooth_devices = await self._scan_bluetooth_windows()
             
         except Exception as e:
             logger.warning(f"Error scanning Bluetooth devices: {e}")
         
         return bluetooth_devices
     
-    def _scan_bluetooth_macos(self) -> List[Dict[str, str]]:
+    async def _run_scan_command(self, *cmd: str) -> Optional[str]:
+        """Run a scan command without blocking the event loop; None on failure"""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=BLUETOOTH_SCAN_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        
+        if proc.returncode != 0:
+            return None
+        return stdout.decode(errors="replace")
+    
+    async def _scan_bluetooth_macos(self) -> List[Dict[str, str]]:
         """Scan for Bluetooth devices on macOS"""
         devices = []
         try:
             # Use system_profiler to get Bluetooth info
-            result = subprocess.run(
-                ["system_profiler", "SPBluetoothDataType", "-json"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            output = await self._run_scan_command("system_profiler", "SPBluetoothDataType", "-json")
             
-            if result.returncode == 0:
+            if output is not None:
                 import json
-                data = json.loads(result.stdout)
+                data = json.loads(output)
                 
                 # Parse Bluetooth devices
                 for item in data.get("SPBluetoothDataType", []):
@@ -505,20 +794,15 @@ class ELM327Scanner:
         
         return devices
     
-    def _scan_bluetooth_linux(self) -> List[Dict[str, str]]:
+    async def _scan_bluetooth_linux(self) -> List[Dict[str, str]]:
         """Scan for Bluetooth devices on Linux"""
         devices = []
         try:
             # Use bluetoothctl to scan for devices
-            result = subprocess.run(
-                ["bluetoothctl", "devices"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            output = await self._run_scan_command("bluetoothctl", "devices")
             
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
+            if output is not None:
+                for line in output.split('\n'):
                     if line.startswith('Device'):
                         parts = line.split()
                         if len(parts) >= 3:
@@ -541,19 +825,19 @@ class ELM327Scanner:
         
         return devices
     
-    def _scan_bluetooth_windows(self) -> List[Dict[str, str]]:
+    async def _scan_bluetooth_windows(self) -> List[Dict[str, str]]:
         """Scan for Bluetooth devices on Windows"""
         devices = []
         try:
             # Use PowerShell to get Bluetooth devices
-            result = subprocess.run([
+            output = await self._run_scan_command(
                 "powershell",
                 "-Command",
                 "Get-PnpDevice | Where-Object {$_.Class -eq 'Bluetooth' -and $_.Status -eq 'OK'} | Select-Object FriendlyName, InstanceId"
-            ], capture_output=True, text=True, timeout=10)
+            )
             
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
+            if output is not None:
+                lines = output.strip().split('\n')
                 for line in lines[2:]:  # Skip header lines
                     if line.strip():
                         parts = line.split()
@@ -576,17 +860,13 @@ class ELM327Scanner:
     
     def _is_likely_obd2_device(self, device_name: str) -> bool:
         """Check if device name suggests it's an OBD2 scanner"""
-        name_lower = device_name.lower()
-        obd2_keywords = [
-            "obd", "elm327", "elm", "obdii", "diagnostic", "scanner",
-            "torque", "car", "auto", "vehicle", "ecu", "canbus"
-        ]
-        return any(keyword in name_lower for keyword in obd2_keywords)
+        return bool(_OBD2_DEVICE_NAME_RE.search(device_name))
     
     def pair_bluetooth_device(self, device_name: str, pin: str = "1234") -> bool:
         """Pair with a Bluetooth OBD2 device"""
         try:
             system = platform.system()
+            ELM327Scanner._port_cache = None  # Pairing adds a port
             
             if system == "Darwin":  # macOS
                 return self._pair_bluetooth_macos(device_name, pin)
@@ -653,13 +933,7 @@ class ELM327Scanner:
         if not port:
             return False
         
-        port_lower = port.lower()
-        bluetooth_indicators = [
-            "bluetooth", "bt", "rfcomm", "/dev/cu.bluetooth", 
-            "/dev/tty.bluetooth", "com", "tty.", "obdii", "obd"
-        ]
-        
-        return any(indicator in port_lower for indicator in bluetooth_indicators)
+        return bool(_BLUETOOTH_PORT_RE.search(port))
     
     def _initialize_bluetooth_connection(self, fast_mode: bool = False):
         """Initialize ELM327 connection over Bluetooth"""
@@ -670,7 +944,7 @@ class ELM327Scanner:
                 self._standard_bluetooth_init()
                 
         except Exception as e:
-            logger.error(f"Bluetooth initialization error: {e}")
+            logger.error("Bluetooth initialization error: %s", e)
             raise
     
     def _fast_bluetooth_init(self):
@@ -678,63 +952,58 @@ class ELM327Scanner:
         # Minimal delay and logging for production speed
         time.sleep(0.5)  # Reduced from 2 seconds
         
-        self.serial_conn.reset_input_buffer()
+        self._discard_input()
         self.serial_conn.reset_output_buffer()
         
         # Essential commands only with minimal delays
-        self._send_command_fast("ATZ")     # Reset
-        time.sleep(1)  # Only wait after reset
-        self._send_command_fast("ATE0")    # Echo off
-        self._send_command_fast("ATH1")    # Headers on
-        self._send_command_fast("ATSP0")   # Protocol auto
-        self._send_command_fast("ATAT1")   # Adaptive timing
+        self._send_command_fast("ATZ")     # Reset; the reply ends at the prompt once it is done
+        self._send_commands([
+            "ATE0",    # Echo off
+            "ATH1",    # Headers on
+            "ATSP0",   # Protocol auto
+            "ATAT2",   # Aggressive adaptive timing
+            "ATST19",  # Response timeout 0x19 x 4 ms = 100 ms
+        ])
         self._send_command_fast("0100")    # Test connection
         
         logger.info("Fast Bluetooth ELM327 initialization complete")
     
     def _standard_bluetooth_init(self):
-        """Standard initialization with full logging (development)"""
+        """Standard initialization (development); per-command replies are logged at DEBUG"""
         logger.info("Starting Bluetooth ELM327 initialization")
         time.sleep(2)
         
-        self.serial_conn.reset_input_buffer()
+        self._discard_input()
         self.serial_conn.reset_output_buffer()
         
         # Send initial commands following the successful pattern
-        logger.info("Sending ATZ (reset)")
-        reset_response = self._send_command_with_delay("ATZ", 3)
-        logger.info(f"ATZ response: {repr(reset_response)}")
-        
-        logger.info("Sending ATE0 (echo off)")
-        echo_response = self._send_command_with_delay("ATE0", 1)
-        logger.info(f"ATE0 response: {repr(echo_response)}")
-        
-        # Follow the successful initialization pattern from the log
-        logger.info("Sending ATH1 (headers on)")
-        self._send_command_with_delay("ATH1", 1)
-        
-        logger.info("Sending ATSP0 (protocol auto)")
-        self._send_command_with_delay("ATSP0", 1)
-        
-        logger.info("Sending ATS0 (spaces off)")
-        self._send_command_with_delay("ATS0", 1)
+        reset_response = self._send_command_with_delay("ATZ", 3)  # Reset
+        if self._trace:
+            logger.debug("ATZ -> %r", _short(reset_response))
         
-        logger.info("Sending ATM0 (memory off)")
-        self._send_command_with_delay("ATM0", 1)
+        echo_response = self._send_command_with_delay("ATE0", 1)  # Echo off
+        if self._trace:
+            logger.debug("ATE0 -> %r", _short(echo_response))
         
-        logger.info("Sending ATAT1 (adaptive timing on)")
-        self._send_command_with_delay("ATAT1", 1)
-        
-        logger.info("Sending ATAL (allow long messages)")
-        self._send_command_with_delay("ATAL", 1)
-        
-        logger.info("Sending ATST64 (timeout 4 seconds)")
-        self._send_command_with_delay("ATST64", 1)
+        # Follow the successful initialization pattern from the log, sent as one batch
+        setup_commands = [
+            "ATH1",    # Headers on
+            "ATSP0",   # Protocol auto
+            "ATS0",    # Spaces off
+            "ATM0",    # Memory off
+            "ATAT1",   # Adaptive timing on
+            "ATAL",    # Allow long messages
+            "ATST64",  # Timeout 4 seconds
+        ]
+        responses = self._send_commands(setup_commands, COMMAND_TIMEOUT)
+        if self._trace:
+            for command, response in zip(setup_commands, responses):
+                logger.debug("%s -> %r", command, _short(response))
         
         # Test connection with supported PIDs
-        logger.info("Testing with 0100 command")
         response = self._send_command_with_delay("0100", 3)
-        logger.info(f"0100 response: {repr(response)}")
+        if self._trace:
+            logger.debug("0100 -> %r", _short(response))
         
         if not response or "NO DATA" in response or "ERROR" in response:
             logger.warning("ELM327 initialization may have failed - check vehicle connection")
@@ -746,30 +1015,25 @@ class ELM327Scanner:
         if not self.connected or not self.serial_conn:
             raise ConnectionError("Not connected to ELM327 scanner")
         
-        self.serial_conn.reset_input_buffer()
-        cmd = f"{command}\r".encode()
-        self.serial_conn.write(cmd)
-        self.serial_conn.flush()
+        self._write_command(command)
+        return self._read_response(FAST_COMMAND_TIMEOUT)
+    
+    def _send_commands(self, commands: List[str], max_timeout: float = FAST_COMMAND_TIMEOUT) -> List[str]:
+        """Send a batch of AT commands in one write and read one reply per prompt"""
+        # Only for AT setup commands: input arriving during an OBD request or ATZ aborts or is lost
+        if not self.connected or not self.serial_conn:
+            raise ConnectionError("Not connected to ELM327 scanner")
         
-        # Fast response reading with shorter timeout
-        response = ""
-        start_time = time.time()
-        max_timeout = 3  # Reduced from 10 seconds
+        if self._awaiting_prompt:
+            self._discard_input()
         
-        while (time.time() - start_time) < max_timeout:
-            if self.serial_conn.in_waiting > 0:
-                try:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        response += line + "\n"
-                        if ">" in line or line.endswith(">"):
-                            break
-                except Exception:
-                    break
-            else:
-                time.sleep(0.05)  # Shorter sleep intervals
+        self._write_bytes(b"".join(COMMAND_BYTES.get(command) or f"{command}\r".encode() for command in commands))
         
-        return response.strip()
+        responses = []
+        for _ in commands:
+            self._awaiting_prompt = True
+            responses.append(self._read_response(max_timeout))
+        return responses
     
     def _initialize_usb_connection(self):
         """Initialize ELM327 connection over USB"""
@@ -779,18 +1043,49 @@ class ELM327Scanner:
             
             # Standard initialization
             self._send_command("ATZ")  # Reset
-            self._send_command("ATE0")  # Echo off
-            self._send_command("ATL0")  # Linefeeds off
+            self._send_commands(["ATE0", "ATL0"], COMMAND_TIMEOUT)  # Echo off, linefeeds off
+            self._switch_baudrate(USB_HIGH_SPEED_BAUDRATE)
             self._send_command("0100")  # Get supported PIDs
             
         except Exception as e:
             logger.error(f"USB initialization error: {e}")
             raise
     
+    def _switch_baudrate(self, target: int) -> bool:
+        """Move the adapter and port to a faster baud rate with ATBRD, staying put on any failure"""
+        # The port always opens at the configured rate, so this runs again on every connect
+        if self.serial_conn.baudrate >= target:
+            return False
+        
+        original = self.serial_conn.baudrate
+        self._write_command(f"ATBRD {ELM327_BAUD_CLOCK // target:02X}")
+        
+        # Clones without ATBRD answer "?"; supported adapters answer OK, then change rate
+        if b"OK" not in self.serial_conn.read_until(b"\r"):
+            self._read_until_prompt(FAST_COMMAND_TIMEOUT)
+            return False
+        
+        # The adapter sends its ID at the new rate and keeps it only if a CR comes back in time
+        self.serial_conn.baudrate = target
+        if b"ELM" in self.serial_conn.read_until(b"\r"):
+            self.serial_conn.write(b"\r")
+            if self._read_until_prompt(FAST_COMMAND_TIMEOUT).endswith(ELM327_PROMPT):
+                # self.baudrate stays the configured rate; an adapter reset falls back to it
+                logger.info(f"Switched ELM327 to {target} baud")
+                return True
+        
+        # The adapter reverts on its own when the handshake fails
+        self.serial_conn.baudrate = original
+        self._awaiting_prompt = True
+        self._read_until_prompt(FAST_COMMAND_TIMEOUT)
+        logger.info(f"ELM327 stayed at {original} baud")
+        return False
+    
     def _send_command_with_delay(self, command: str, delay: float = 1.0) -> str:
-        """Send command with specified delay (for Bluetooth connections)"""
+        """Send command, pausing for delay only if the reply never reached the prompt"""
         response = self._send_command(command)
-        time.sleep(delay)
+        if self._awaiting_prompt:
+            time.sleep(delay)  # Give a slow link time to finish before the next command
         return response
     
     # ===== Full Diagnostic Scan Methods =====
@@ -799,32 +1094,8 @@ class ELM327Scanner:
         """Get pending DTC codes (Mode 07)"""
         try:
             response = self._send_command("07")
-            codes = []
+            codes = self._parse_dtc_response(response, "47")
             
-            lines = response.split('\n')
-            for line in lines:
-                if "47" in line and len(line) > 10:  # Mode 7 response
-                    line_clean = line.strip()
-                    mode7_pos = line_clean.find("47")
-                    if mode7_pos >= 0:
-                        dtc_data = line_clean[mode7_pos + 2:]
-                        
-                        for i in range(0, len(dtc_data) - 3, 4):
-                            if i + 4 <= len(dtc_data):
-                                try:
-                                    first_byte = dtc_data[i:i+2]
-                                    second_byte = dtc_data[i+2:i+4]
-                                    
-                                    if first_byte == "00" and second_byte == "00":
-                                        break
-                                        
-                                    code = self._parse_dtc(first_byte, second_byte)
-                                    if code and code not in codes:
-                                        codes.append(code)
-                                except Exception as e:
-                                    logger.warning(f"Error parsing pending DTC: {e}")
-                                    continue
-                                    
             logger.info(f"Found {len(codes)} pending DTC codes: {codes}")
             return codes
             
@@ -836,32 +1107,8 @@ class ELM327Scanner:
         """Get permanent DTC codes (Mode 0A)"""
         try:
             response = self._send_command("0A")
-            codes = []
+            codes = self._parse_dtc_response(response, "4A")
             
-            lines = response.split('\n')
-            for line in lines:
-                if "4A" in line and len(line) > 10:  # Mode 0A response
-                    line_clean = line.strip()
-                    mode_pos = line_clean.find("4A")
-                    if mode_pos >= 0:
-                        dtc_data = line_clean[mode_pos + 2:]
-                        
-                        for i in range(0, len(dtc_data) - 3, 4):
-                            if i + 4 <= len(dtc_data):
-                                try:
-                                    first_byte = dtc_data[i:i+2]
-                                    second_byte = dtc_data[i+2:i+4]
-                                    
-                                    if first_byte == "00" and second_byte == "00":
-                                        break
-                                        
-                                    code = self._parse_dtc(first_byte, second_byte)
-                                    if code and code not in codes:
-                                        codes.append(code)
-                                except Exception as e:
-                                    logger.warning(f"Error parsing permanent DTC: {e}")
-                                    continue
-                                    
             logger.info(f"Found {len(codes)} permanent DTC codes: {codes}")
             return codes
             
@@ -910,21 +1157,14 @@ class ELM327Scanner:
         monitors["DTC_Count"] = str(dtc_count)
         
         # Byte B - Monitor support and completion status
-        # Bit definitions for gasoline vehicles
-        monitor_names = [
-            "Misfire", "Fuel System", "Components", "Reserved",
-            "Catalyst", "Heated Catalyst", "Evap System", "Secondary Air"
-        ]
-        
-        for i, name in enumerate(monitor_names):
-            if i < 8:
-                supported = (byte_b & (1 << i)) == 0  # Bit 0 = supported
-                complete = (byte_c & (1 << i)) == 0   # Bit 0 = complete
-                
-                if supported:
-                    monitors[name] = "Ready" if complete else "Not Ready"
-                else:
-                    monitors[name] = "Not Supported"
+        for i, name in enumerate(READINESS_MONITOR_NAMES):
+            supported = (byte_b & (1 << i)) == 0  # Bit 0 = supported
+            complete = (byte_c & (1 << i)) == 0   # Bit 0 = complete
+            
+            if supported:
+                monitors[name] = "Ready" if complete else "Not Ready"
+            else:
+                monitors[name] = "Not Supported"
         
         return monitors
     
@@ -934,28 +1174,21 @@ class ELM327Scanner:
         
         # Define PIDs based on scan type
         if scan_type == "quick":
-            pids = ["010C", "010D", "0105", "010F"]  # RPM, Speed, Coolant temp, Intake temp
+            pids = QUICK_SCAN_PIDS
         elif scan_type == "emissions":
-            pids = ["010C", "010D", "0105", "0106", "0107", "0108", "0109", "010A", "010B"]
+            pids = EMISSIONS_SCAN_PIDS
         else:  # comprehensive or custom
-            pids = [
-                "010C", "010D", "0105", "010F", "0111", "0104", "0106", "0107", 
-                "0108", "0109", "010A", "010B", "0110", "0114", "0115", "0142"
-            ]
+            pids = COMPREHENSIVE_SCAN_PIDS
         
-        for pid in pids:
-            try:
-                sensor_data = self.get_sensor_data(pid)
-                if sensor_data:
-                    parameters[sensor_data.description] = {
-                        "value": sensor_data.value,
-                        "unit": sensor_data.unit,
-                        "pid": sensor_data.pid
-                    }
-                    time.sleep(0.1)  # Small delay between readings
-            except Exception as e:
-                logger.warning(f"Error reading PID {pid}: {e}")
-                continue
+        try:
+            for sensor_data in self.get_multiple_sensor_data(pids).values():
+                parameters[sensor_data.description] = {
+                    "value": sensor_data.value,
+                    "unit": sensor_data.unit,
+                    "pid": sensor_data.pid
+                }
+        except Exception as e:
+            logger.warning(f"Error reading live parameters: {e}")
         
         return parameters
     
@@ -964,33 +1197,10 @@ class ELM327Scanner:
         try:
             response = self._send_command("0902")
             
-            # Parse VIN from response
-            lines = response.split('\n')
-            vin_data = ""
-            
-            for line in lines:
-                if "49 02" in line:
-                    # Extract hex data after "49 02"
-                    parts = line.strip().split()
-                    if len(parts) > 2:
-                        # Skip "49 02" and get the data
-                        hex_data = ''.join(parts[2:])
-                        try:
-                            # Convert hex to ASCII
-                            vin_chars = bytes.fromhex(hex_data).decode('ascii', errors='ignore')
-                            vin_data += vin_chars
-                        except:
-                            continue
-            
-            # Clean and validate VIN
-            vin = ''.join(c for c in vin_data if c.isalnum()).strip()
-            if len(vin) >= 17:
-                vin = vin[:17]  # VIN is exactly 17 characters
+            vin = self._parse_vin(response)
+            if vin:
                 logger.info(f"Retrieved VIN via OBD2: {vin}")
-                return vin
-            
-            logger.warning(f"Invalid VIN length: {len(vin)}")
-            return None
+            return vin
             
         except Exception as e:
             logger.error(f"Error getting VIN via OBD2: {e}")
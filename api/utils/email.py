@@ -1,32 +1,173 @@
 # api/utils/email.py
 import os
+import html
 import logging
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from dataclasses import dataclass
+from string import Template
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+SENDGRID_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+SMTP_TIMEOUT = 10  # seconds
+
+# Magic link email bodies; ${app_name} is filled in once per service, the rest per send
+MAGIC_LINK_HTML_TEMPLATE = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>Sign in to ${app_name}</title>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { text-align: center; margin-bottom: 30px; }
+                .button { 
+                    display: inline-block; 
+                    padding: 12px 24px; 
+                    background-color: #007bff; 
+                    color: white; 
+                    text-decoration: none; 
+                    border-radius: 5px; 
+                    margin: 20px 0; 
+                }
+                .footer { margin-top: 30px; font-size: 12px; color: #666; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>${app_name}</h1>
+                </div>
+                
+                <h2>Hi ${name}!</h2>
+                
+                <p>We received a request to sign in to your ${app_name} account.</p>
+                
+                <p>Click the button below to sign in:</p>
+                
+                <p style="text-align: center;">
+                    <a href="${magic_link}" class="button">Sign In</a>
+                </p>
+                
+                <p>Or copy and paste this link into your browser:</p>
+                <p style="word-break: break-all; background: #f5f5f5; padding: 10px; border-radius: 3px;">
+                    ${magic_link}
+                </p>
+                
+                <p><strong>This link will expire in 15 minutes.</strong></p>
+                
+                <p>If you didn't request this email, you can safely ignore it.</p>
+                
+                <div class="footer">
+                    <p>This email was sent by ${app_name}</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+MAGIC_LINK_TEXT_TEMPLATE = """
+Hi ${name}!
+
+We received a request to sign in to your ${app_name} account.
+
+Click this link to sign in:
+${magic_link}
+
+This link will expire in 15 minutes.
+
+If you didn't request this email, you can safely ignore it.
+
+---
+${app_name}
+        """.strip()
+
+def _prefill_template(template: str, **values: str) -> Template:
+    """Substitute per-process values once and return a template for the per-send ones"""
+    escaped = {key: value.replace("$", "$$") for key, value in values.items()}
+    return Template(Template(template).safe_substitute(escaped))
+
+@dataclass(frozen=True, slots=True)
+class _EmailConfig:
+    """Email settings read from the environment"""
+    smtp_server: Optional[str]
+    smtp_port: int
+    smtp_username: Optional[str]
+    smtp_password: Optional[str]
+    from_email: Optional[str]
+    from_name: str
+    sendgrid_api_key: Optional[str]
+    app_name: str
+    frontend_url: str
+    backend_url: str
+    
+    @classmethod
+    def from_env(cls) -> "_EmailConfig":
+        """Read every email setting once"""
+        smtp_username = os.getenv("SMTP_USERNAME")
+        return cls(
+            smtp_server=os.getenv("SMTP_SERVER"),
+            smtp_port=int(os.getenv("SMTP_PORT", "587")),
+            smtp_username=smtp_username,
+            smtp_password=os.getenv("SMTP_PASSWORD"),
+            from_email=os.getenv("FROM_EMAIL", smtp_username),
+            from_name=os.getenv("FROM_NAME", "OBD2 Scanner"),
+            sendgrid_api_key=os.getenv("SENDGRID_API_KEY"),
+            app_name=os.getenv("APP_NAME", "OBD2 Scanner"),
+            frontend_url=os.getenv("FRONTEND_URL", "http://localhost:3000"),
+            backend_url=os.getenv("BACKEND_URL", "http://localhost:8080"),
+        )
+
+_CONFIG = _EmailConfig.from_env()
+
 class EmailService:
     """Email service for sending magic links"""
     
-    def __init__(self):
-        self.smtp_server = os.getenv("SMTP_SERVER")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_username = os.getenv("SMTP_USERNAME")
-        self.smtp_password = os.getenv("SMTP_PASSWORD")
-        self.from_email = os.getenv("FROM_EMAIL", self.smtp_username)
-        self.from_name = os.getenv("FROM_NAME", "OBD2 Scanner")
+    def __init__(self, config: _EmailConfig = _CONFIG):
+        self.smtp_server = config.smtp_server
+        self.smtp_port = config.smtp_port
+        self.smtp_username = config.smtp_username
+        self.smtp_password = config.smtp_password
+        self.from_email = config.from_email
+        self.from_name = config.from_name
+        
+        # Long-lived SMTP connection reused across sends, guarded for background threads
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
         
         # SendGrid API (alternative to SMTP)
-        self.sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
+        self.sendgrid_api_key = config.sendgrid_api_key
+        
+        # Shared session so SendGrid calls reuse a pooled keep-alive TLS connection
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        if self.sendgrid_api_key:
+            self._session.headers.update({
+                "Authorization": f"Bearer {self.sendgrid_api_key}",
+                "Content-Type": "application/json"
+            })
         
         # App configuration
-        self.app_name = os.getenv("APP_NAME", "OBD2 Scanner")
-        self.frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        self.backend_url = os.getenv("BACKEND_URL", "http://localhost:8080")
+        self.app_name = config.app_name
+        self.frontend_url = config.frontend_url
+        self.backend_url = config.backend_url
+        
+        # Per-process message fields shared by every send
+        self._subject = f"Sign in to {self.app_name}"
+        self._sendgrid_sender = {"email": self.from_email, "name": self.from_name}
+        self._smtp_sender = f"{self.from_name} <{self.from_email}>"
+        
+        # Email bodies with the app name already in place
+        self._html_template = _prefill_template(MAGIC_LINK_HTML_TEMPLATE, app_name=html.escape(self.app_name))
+        self._text_template = _prefill_template(MAGIC_LINK_TEXT_TEMPLATE, app_name=self.app_name)
     
     def send_magic_link(self, email: str, name: Optional[str], token: str) -> bool:
         """Send magic link email to user"""
@@ -53,21 +194,15 @@ class EmailService:
     def _send_via_sendgrid(self, email: str, name: Optional[str], magic_link: str) -> bool:
         """Send email via SendGrid API"""
         try:
-            url = "https://api.sendgrid.com/v3/mail/send"
-            
-            subject = f"Sign in to {self.app_name}"
             html_content = self._generate_html_email(name or "there", magic_link)
             text_content = self._generate_text_email(name or "there", magic_link)
             
             data = {
                 "personalizations": [{
                     "to": [{"email": email, "name": name or ""}],
-                    "subject": subject
+                    "subject": self._subject
                 }],
-                "from": {
-                    "email": self.from_email,
-                    "name": self.from_name
-                },
+                "from": self._sendgrid_sender,
                 "content": [
                     {
                         "type": "text/plain",
@@ -80,35 +215,28 @@ class EmailService:
                 ]
             }
             
-            headers = {
-                "Authorization": f"Bearer {self.sendgrid_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, json=data, headers=headers)
+            response = self._session.post(SENDGRID_URL, json=data, timeout=SENDGRID_TIMEOUT)
             
-            logger.info(f"SendGrid API response: {response.status_code}")
-            logger.info(f"SendGrid response headers: {dict(response.headers)}")
+            logger.info("SendGrid API response: %s", response.status_code)
             
             if response.status_code == 202:
-                logger.info(f"Magic link email sent successfully to {email}")
+                logger.info("Magic link email sent successfully to %s", email)
                 return True
             else:
-                logger.error(f"SendGrid API error: {response.status_code} - {response.text}")
-                logger.error(f"Request data: {data}")
-                logger.error(f"Request headers: {headers}")
+                logger.error("SendGrid API error: %s - %s", response.status_code, response.text)
+                logger.error("Request data: %s", data)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error sending via SendGrid: {e}")
+            logger.error("Error sending via SendGrid: %s", e)
             return False
     
     def _send_via_smtp(self, email: str, name: Optional[str], magic_link: str) -> bool:
         """Send email via SMTP"""
         try:
             msg = MIMEMultipart("alternative")
-            msg["Subject"] = f"Sign in to {self.app_name}"
-            msg["From"] = f"{self.from_name} <{self.from_email}>"
+            msg["Subject"] = self._subject
+            msg["From"] = self._smtp_sender
             msg["To"] = email
             
             # Create text and HTML versions
@@ -121,93 +249,55 @@ class EmailService:
             msg.attach(part1)
             msg.attach(part2)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            # Send email over the shared connection, reconnecting once if the server dropped it
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    self._smtp = None
+                    self._get_smtp().send_message(msg)
             
-            logger.info(f"Magic link email sent successfully to {email}")
+            logger.info("Magic link email sent successfully to %s", email)
             return True
             
         except Exception as e:
-            logger.error(f"Error sending via SMTP: {e}")
+            logger.error("Error sending via SMTP: %s", e)
             return False
     
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return a live SMTP connection, opening a new one if needed (call with _smtp_lock held)"""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._close_smtp()
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT)
+        try:
+            server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        """Drop the shared SMTP connection"""
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+    
     def _generate_html_email(self, name: str, magic_link: str) -> str:
         """Generate HTML email content"""
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Sign in to {self.app_name}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ text-align: center; margin-bottom: 30px; }}
-                .button {{ 
-                    display: inline-block; 
-                    padding: 12px 24px; 
-                    background-color: #007bff; 
-                    color: white; 
-                    text-decoration: none; 
-                    border-radius: 5px; 
-                    margin: 20px 0; 
-                }}
-                .footer {{ margin-top: 30px; font-size: 12px; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{self.app_name}</h1>
-                </div>
-                
-                <h2>Hi {name}!</h2>
-                
-                <p>We received a request to sign in to your {self.app_name} account.</p>
-                
-                <p>Click the button below to sign in:</p>
-                
-                <p style="text-align: center;">
-                    <a href="{magic_link}" class="button">Sign In</a>
-                </p>
-                
-                <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; background: #f5f5f5; padding: 10px; border-radius: 3px;">
-                    {magic_link}
-                </p>
-                
-                <p><strong>This link will expire in 15 minutes.</strong></p>
-                
-                <p>If you didn't request this email, you can safely ignore it.</p>
-                
-                <div class="footer">
-                    <p>This email was sent by {self.app_name}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        return self._html_template.substitute(name=html.escape(name), magic_link=html.escape(magic_link))
     
     def _generate_text_email(self, name: str, magic_link: str) -> str:
         """Generate plain text email content"""
-        return f"""
-Hi {name}!
-
-We received a request to sign in to your {self.app_name} account.
-
-Click this link to sign in:
-{magic_link}
-
-This link will expire in 15 minutes.
-
-If you didn't request this email, you can safely ignore it.
-
----
-{self.app_name}
-        """.strip()
+        return self._text_template.substitute(name=name, magic_link=magic_link)
 
 # Global email service instance
 email_service = EmailService()
\ No newline at end of file
@@ -6,27 +6,111 @@ This orchestrator manages the diagnostic workflow using a state-driven approach
 with LLM planning, tool execution, and response composition.
 """
 
-import json
+import re
+import asyncio
+import orjson
 import logging
 import time
 import traceback
+from functools import lru_cache
 import requests
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Set, Union
 from dataclasses import dataclass, asdict
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float
 from sqlalchemy.sql import func
 
 from api.utils.elm327 import ELM327Scanner
-from api.utils.dtc import get_code_description, get_dtc_severity, categorize_dtc
+from api.utils.dtc import get_code_descriptions, get_dtc_severity, categorize_dtcs
 from db.models import User, DiagnosticOrchestrationSession
 import uuid
 
 logger = logging.getLogger(__name__)
 
+TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
+TOGETHER_MODEL = "mistralai/Mistral-7B-Instruct-v0.1"
+TOGETHER_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+NHTSA_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVinValuesExtended/{vin}?format=json"
+NHTSA_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+VIN_CACHE_SIZE = 4096
+
+# JSON object inside a ``` or ```json fence in an LLM reply
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.S)
+
+# Hypotheses carried into the planning context
+PLANNING_HYPOTHESIS_LIMIT = 5
+
+# Query terms that add an OBD read to the fallback plan, matched in a single scan
+OBD_TRIGGER_TERMS = ("code", "dtc", "check engine", "light", "engine", "diagnostic")
+_OBD_TRIGGER_RE = re.compile("|".join(map(re.escape, OBD_TRIGGER_TERMS)), re.IGNORECASE)
+
+# Shared HTTP session so Together.ai and NHTSA calls reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504])
+))
+
+@lru_cache(maxsize=VIN_CACHE_SIZE)
+def _decode_vin(vin: str) -> Dict[str, str]:
+    """Decode a VIN via NHTSA; a VIN's decode never changes, so successes are cached (failures raise)"""
+    response = _SESSION.get(NHTSA_URL.format(vin=vin), timeout=NHTSA_TIMEOUT)
+    response.raise_for_status()
+    vin_data = response.json()["Results"][0]
+    return {
+        "make": vin_data.get("Make", "Unknown"),
+        "model": vin_data.get("Model", "Unknown"),
+        "year": vin_data.get("ModelYear", "Unknown"),
+        "engine": vin_data.get("EngineModel", "Unknown"),
+        "displacement": vin_data.get("DisplacementL", "Unknown"),
+        "fuel_type": vin_data.get("FuelTypePrimary", "Unknown"),
+        "transmission": vin_data.get("TransmissionStyle", "Unknown"),
+        "drive_type": vin_data.get("DriveType", "Unknown"),
+        "vehicle_class": vin_data.get("VehicleType", "Unknown")
+    }
+
+def _read_streamed_plan(response: requests.Response) -> str:
+    """Collect a streamed chat completion, stopping once the first top-level JSON object closes"""
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+        choices = orjson.loads(data).get("choices") or [{}]
+        text = (choices[0].get("delta") or {}).get("content") or ""
+        
+        # Track braces outside JSON strings; quotes in prose before the object are ignored
+        for i, char in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"' and depth:
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}" and depth:
+                depth -= 1
+                if not depth:
+                    parts.append(text[:i + 1])
+                    return "".join(parts)
+        parts.append(text)
+    return "".join(parts)
+
 class DiagnosticState(Enum):
     PLANNING = "planning"
     EXECUTING = "executing"
@@ -41,6 +125,15 @@ class ActionType(Enum):
     REQUIRE_CONSENT = "require_consent"
     VERIFY_FIX = "verify_fix"
 
+# Action types the LLM planner may request, keyed by their plan string; anything else is a spec lookup
+PLANNABLE_ACTION_TYPES = {
+    action_type.value: action_type
+    for action_type in (ActionType.OBD_READ, ActionType.SPEC_LOOKUP, ActionType.RAG_SEARCH)
+}
+
+# Actions that only make outbound HTTP calls and can run alongside each other
+CONCURRENT_ACTION_TYPES = frozenset({ActionType.SPEC_LOOKUP, ActionType.RAG_SEARCH})
+
 @dataclass
 class VehicleSnapshot:
     vin: Optional[str] = None
@@ -56,7 +149,7 @@ class VehicleSnapshot:
         if self.sensor_data is None:
             self.sensor_data = {}
 
-@dataclass
+@dataclass(slots=True)
 class LiveTelemetry:
     timestamp: datetime
     engine_rpm: Optional[float] = None
@@ -70,7 +163,7 @@ class LiveTelemetry:
         if self.additional_params is None:
             self.additional_params = {}
 
-@dataclass
+@dataclass(slots=True)
 class DiagnosticHypothesis:
     id: str
     description: str
@@ -79,14 +172,14 @@ class DiagnosticHypothesis:
     next_steps: List[str]
     created_at: datetime
     
-@dataclass 
+@dataclass(slots=True)
 class DiagnosticAction:
     type: ActionType
     parameters: Dict[str, Any]
     require_consent: bool = False
     description: str = ""
     
-@dataclass
+@dataclass(slots=True)
 class ActionResult:
     success: bool
     data: Dict[str, Any]
@@ -128,6 +221,8 @@ class StateManager:
         self.db_session = db_session
         self.user_id = user_id
         self._session_record: Optional[DiagnosticOrchestrationSession] = None
+        # Fields changed since the last flush; written back in one commit
+        self._dirty: Set[str] = set()
         self._load_or_create_session()
         
     def _load_or_create_session(self):
@@ -145,8 +240,25 @@ class StateManager:
                 hypotheses=[],
                 execution_history=[]
             )
+            # Inserted by the first flush() rather than committed now, which would
+            # expire the new row and force a re-SELECT on the next attribute access
             self.db_session.add(self._session_record)
-            self.db_session.commit()
+            
+    def _mark_dirty(self, field: str):
+        """Record a changed column; persisted on the next flush()"""
+        # JSON columns are mutated in place, so tell SQLAlchemy explicitly
+        flag_modified(self._session_record, field)
+        self._dirty.add(field)
+        
+    def flush(self):
+        """Commit all buffered state changes in a single transaction"""
+        if not self._session_record:
+            return
+        if not self._dirty and self._session_record not in self.db_session.new:
+            return
+        self._session_record.updated_at = func.now()
+        self.db_session.commit()
+        self._dirty.clear()
             
     def get_vehicle_snapshot(self) -> Optional[VehicleSnapshot]:
         if self._session_record and self._session_record.vehicle_snapshot:
@@ -156,28 +268,34 @@ class StateManager:
     def set_vehicle_snapshot(self, snapshot: VehicleSnapshot):
         if self._session_record:
             self._session_record.vehicle_snapshot = asdict(snapshot)
-            self._session_record.updated_at = func.now()
-            self.db_session.commit()
+            self._mark_dirty("vehicle_snapshot")
             
     def add_live_telemetry(self, telemetry: LiveTelemetry):
         if self._session_record:
             current_telemetry = self._session_record.live_telemetry or []
             
-            telemetry_dict = asdict(telemetry)
-            telemetry_dict['timestamp'] = telemetry.timestamp.isoformat()
-            current_telemetry.append(telemetry_dict)
+            # Flat projection instead of asdict's recursive deep copy
+            current_telemetry.append({
+                'timestamp': telemetry.timestamp.isoformat(),
+                'engine_rpm': telemetry.engine_rpm,
+                'vehicle_speed': telemetry.vehicle_speed,
+                'engine_temp': telemetry.engine_temp,
+                'fuel_level': telemetry.fuel_level,
+                'throttle_position': telemetry.throttle_position,
+                'additional_params': telemetry.additional_params
+            })
             
-            # Keep only last 100 records
+            # Keep only last 100 records, trimming in place rather than copying the list
             if len(current_telemetry) > 100:
-                current_telemetry = current_telemetry[-50:]
+                del current_telemetry[:-50]
                 
             self._session_record.live_telemetry = current_telemetry
-            self._session_record.updated_at = func.now()
-            self.db_session.commit()
+            self._mark_dirty("live_telemetry")
             
     def get_latest_telemetry(self) -> Optional[LiveTelemetry]:
         if self._session_record and self._session_record.live_telemetry:
-            latest = self._session_record.live_telemetry[-1]
+            # Build from a copy so the stored row keeps JSON-serializable values until flush
+            latest = dict(self._session_record.live_telemetry[-1])
             latest['timestamp'] = datetime.fromisoformat(latest['timestamp'])
             return LiveTelemetry(**latest)
         return None
@@ -185,36 +303,65 @@ class StateManager:
     def add_hypothesis(self, hypothesis: DiagnosticHypothesis):
         if self._session_record:
             current_hypotheses = self._session_record.hypotheses or []
-            hypothesis_dict = asdict(hypothesis)
-            hypothesis_dict['created_at'] = hypothesis.created_at.isoformat()
-            current_hypotheses.append(hypothesis_dict)
+            current_hypotheses.append({
+                'id': hypothesis.id,
+                'description': hypothesis.description,
+                'confidence': hypothesis.confidence,
+                'supporting_evidence': hypothesis.supporting_evidence,
+                'next_steps': hypothesis.next_steps,
+                'created_at': hypothesis.created_at.isoformat()
+            })
             
             self._session_record.hypotheses = current_hypotheses
-            self._session_record.updated_at = func.now()
-            self.db_session.commit()
+            self._mark_dirty("hypotheses")
         
     def get_hypotheses(self) -> List[DiagnosticHypothesis]:
         if self._session_record and self._session_record.hypotheses:
-            hypotheses = []
-            for h_dict in self._session_record.hypotheses:
-                h_dict['created_at'] = datetime.fromisoformat(h_dict['created_at'])
-                hypotheses.append(DiagnosticHypothesis(**h_dict))
-            return hypotheses
+            return self._build_hypotheses(self._session_record.hypotheses)
+        return []
+        
+    def get_recent_hypotheses(self, limit: int) -> List[DiagnosticHypothesis]:
+        """Deserialize only the newest `limit` hypotheses"""
+        if self._session_record and self._session_record.hypotheses:
+            return self._build_hypotheses(self._session_record.hypotheses[-limit:])
         return []
         
+    def get_hypothesis_count(self) -> int:
+        if self._session_record and self._session_record.hypotheses:
+            return len(self._session_record.hypotheses)
+        return 0
+        
+    @staticmethod
+    def _build_hypotheses(stored_hypotheses: List[Dict[str, Any]]) -> List[DiagnosticHypothesis]:
+        hypotheses = []
+        for stored in stored_hypotheses:
+            h_dict = dict(stored)
+            h_dict['created_at'] = datetime.fromisoformat(h_dict['created_at'])
+            hypotheses.append(DiagnosticHypothesis(**h_dict))
+        return hypotheses
+        
     def add_execution_record(self, action: DiagnosticAction, result: ActionResult):
         if self._session_record:
             current_history = self._session_record.execution_history or []
             record = {
                 'timestamp': datetime.now().isoformat(),
-                'action': asdict(action),
-                'result': asdict(result)
+                'action': {
+                    'type': action.type.value,
+                    'parameters': action.parameters,
+                    'require_consent': action.require_consent,
+                    'description': action.description
+                },
+                'result': {
+                    'success': result.success,
+                    'data': result.data,
+                    'error': result.error,
+                    'execution_time': result.execution_time
+                }
             }
             current_history.append(record)
             
             self._session_record.execution_history = current_history
-            self._session_record.updated_at = func.now()
-            self.db_session.commit()
+            self._mark_dirty("execution_history")
         
     def get_execution_history(self) -> List[Dict[str, Any]]:
         return self._session_record.execution_history or [] if self._session_record else []
@@ -222,8 +369,7 @@ class StateManager:
     def set_state(self, state: DiagnosticState):
         if self._session_record:
             self._session_record.current_state = state.value
-            self._session_record.updated_at = func.now()
-            self.db_session.commit()
+            self._mark_dirty("current_state")
     
     def get_state(self) -> DiagnosticState:
         if self._session_record and self._session_record.current_state:
@@ -272,6 +418,8 @@ class DiagnosticOrchestrator:
         self.state_manager = StateManager(session_id, db_session, user_id)
         self.current_state = self.state_manager.get_state()
         self._current_plan: Optional[DiagnosticPlan] = None
+        # Scanner connection held across OBD reads, closed when diagnose() finishes
+        self._scanner: Optional[ELM327Scanner] = None
         self.together_api_key = os.getenv("TOGETHER_API_KEY")
         
     async def diagnose(self, 
@@ -328,6 +476,15 @@ class DiagnosticOrchestrator:
                 recommendations=["Contact support if the issue persists"],
                 confidence=0.0
             )
+        finally:
+            await self._close_scanner()
+            
+            # Persist everything buffered during this diagnosis in one commit
+            try:
+                self.state_manager.flush()
+            except Exception as e:
+                logger.error(f"Failed to persist diagnostic session: {e}")
+                self.db_session.rollback()
     
     async def _plan_diagnosis(self, user_query: str) -> DiagnosticPlan:
         """Plan diagnostic steps using LLM"""
@@ -342,32 +499,40 @@ class DiagnosticOrchestrator:
         try:
             plan_prompt = self._generate_planning_prompt(user_query, context)
             
-            response = requests.post(
-                "https://api.together.xyz/v1/chat/completions",
+            # Run the blocking request off the event loop; the plan is streamed so
+            # reading can stop as soon as the JSON object is complete
+            response = await asyncio.to_thread(
+                _SESSION.post,
+                TOGETHER_URL,
                 headers={
                     "Authorization": f"Bearer {self.together_api_key}",
                     "Content-Type": "application/json"
                 },
                 json={
-                    "model": "mistralai/Mistral-7B-Instruct-v0.1",
+                    "model": TOGETHER_MODEL,
                     "messages": [
                         {"role": "system", "content": "You are a diagnostic planning AI that creates structured diagnostic plans in JSON format."},
                         {"role": "user", "content": plan_prompt}
                     ],
                     "temperature": 0.3,
-                    "max_tokens": 1500
-                }
+                    "max_tokens": 1500,
+                    "stream": True
+                },
+                timeout=TOGETHER_TIMEOUT,
+                stream=True
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                plan_json = result["choices"][0]["message"]["content"]
-                plan = self._parse_plan_from_llm(plan_json, user_query)
-                self._current_plan = plan
-                return plan
-            else:
-                logger.error(f"LLM planning failed: {response.status_code}")
-                return self._create_basic_plan(user_query)
+            try:
+                if response.status_code == 200:
+                    plan_json = await asyncio.to_thread(_read_streamed_plan, response)
+                    plan = self._parse_plan_from_llm(plan_json, user_query)
+                    self._current_plan = plan
+                    return plan
+                else:
+                    logger.error(f"LLM planning failed: {response.status_code}")
+                    return self._create_basic_plan(user_query)
+            finally:
+                response.close()
                 
         except Exception as e:
             logger.error(f"Error in LLM planning: {e}")
@@ -424,29 +589,22 @@ RESPOND ONLY WITH VALID JSON."""
     def _parse_plan_from_llm(self, plan_json: str, user_query: str) -> DiagnosticPlan:
         """Parse LLM response into DiagnosticPlan"""
         try:
-            # Extract JSON from response if it contains extra text
-            if "```json" in plan_json:
-                json_start = plan_json.find("```json") + 7
-                json_end = plan_json.find("```", json_start)
-                plan_json = plan_json[json_start:json_end].strip()
-            elif "{" in plan_json:
-                json_start = plan_json.find("{")
-                json_end = plan_json.rfind("}") + 1
-                plan_json = plan_json[json_start:json_end]
-                
-            plan_data = json.loads(plan_json)
+            try:
+                plan_data = orjson.loads(plan_json)
+            except orjson.JSONDecodeError:
+                # Extract JSON from response if it contains extra text
+                fenced = _JSON_FENCE_RE.search(plan_json)
+                if fenced:
+                    plan_json = fenced.group(1)
+                elif "{" in plan_json:
+                    json_start = plan_json.find("{")
+                    json_end = plan_json.rfind("}") + 1
+                    plan_json = plan_json[json_start:json_end]
+                plan_data = orjson.loads(plan_json)
             
             steps = []
             for step_data in plan_data.get("steps", []):
-                action_type_str = step_data.get("action_type", "spec_lookup")
-                action_type = ActionType.SPEC_LOOKUP  # default
-                
-                if action_type_str == "obd_read":
-                    action_type = ActionType.OBD_READ
-                elif action_type_str == "rag_search":
-                    action_type = ActionType.RAG_SEARCH
-                elif action_type_str == "spec_lookup":
-                    action_type = ActionType.SPEC_LOOKUP
+                action_type = PLANNABLE_ACTION_TYPES.get(step_data.get("action_type"), ActionType.SPEC_LOOKUP)
                     
                 action = DiagnosticAction(
                     type=action_type,
@@ -489,8 +647,7 @@ RESPOND ONLY WITH VALID JSON."""
         ))
         
         # Add OBD reading if query suggests diagnostic codes or engine issues
-        query_lower = user_query.lower()
-        if any(term in query_lower for term in ["code", "dtc", "check engine", "light", "engine", "diagnostic"]):
+        if _OBD_TRIGGER_RE.search(user_query):
             steps.append(PlanStep(
                 action=DiagnosticAction(
                     type=ActionType.OBD_READ,
@@ -523,18 +680,34 @@ RESPOND ONLY WITH VALID JSON."""
         """Execute planned diagnostic steps"""
         results = []
         
-        for step in plan.steps:
+        # Spec and knowledge lookups are independent HTTP calls, so start them all up front;
+        # scanner and verification steps still run in plan order
+        lookup_indices = [
+            i for i, step in enumerate(plan.steps)
+            if step.action.type in CONCURRENT_ACTION_TYPES and not step.action.require_consent
+        ]
+        lookups = asyncio.ensure_future(asyncio.gather(
+            *(self._execute_action(plan.steps[i].action) for i in lookup_indices)
+        ))
+        lookup_results = None
+        
+        for i, step in enumerate(plan.steps):
             action = step.action
             
-            # Check if consent is required
-            if action.require_consent:
-                consent_result = await self._handle_consent_required(action)
-                if not consent_result.success:
-                    results.append(consent_result)
-                    continue
-            
-            # Execute the action
-            result = await self._execute_action(action)
+            if i in lookup_indices:
+                if lookup_results is None:
+                    lookup_results = dict(zip(lookup_indices, await lookups))
+                result = lookup_results[i]
+            else:
+                # Check if consent is required
+                if action.require_consent:
+                    consent_result = await self._handle_consent_required(action)
+                    if not consent_result.success:
+                        results.append(consent_result)
+                        continue
+                
+                # Execute the action
+                result = await self._execute_action(action)
             results.append(result)
             
             # Record execution
@@ -626,10 +799,11 @@ RESPOND ONLY WITH VALID JSON."""
         if telemetry:
             context["live_data"] = asdict(telemetry)
             
-        # Add hypotheses
-        hypotheses = self.state_manager.get_hypotheses()
+        # Add the most recent hypotheses; older ones only count towards the total
+        hypotheses = self.state_manager.get_recent_hypotheses(PLANNING_HYPOTHESIS_LIMIT)
         if hypotheses:
             context["hypotheses"] = [asdict(h) for h in hypotheses]
+            context["hypothesis_count"] = self.state_manager.get_hypothesis_count()
             
         return context
     
@@ -680,13 +854,34 @@ RESPOND ONLY WITH VALID JSON."""
             
         return recommendations
     
+    async def _get_scanner(self) -> Optional[ELM327Scanner]:
+        """Return the shared scanner, connecting on first use"""
+        if self._scanner is None or not self._scanner.connected:
+            await self._close_scanner()
+            scanner = ELM327Scanner()
+            if not await scanner.run_io(scanner.connect):
+                scanner.close()
+                return None
+            self._scanner = scanner
+        return self._scanner
+    
+    async def _close_scanner(self):
+        """Disconnect and discard the shared scanner if there is one"""
+        scanner, self._scanner = self._scanner, None
+        if scanner is not None:
+            try:
+                await scanner.run_io(scanner.disconnect)
+            except Exception as e:
+                logger.warning(f"Scanner disconnect failed: {e}")
+            finally:
+                scanner.close()
+    
     async def _execute_obd_read(self, parameters: Dict[str, Any]) -> ActionResult:
         """Execute OBD2 read operation"""
         try:
-            scanner = ELM327Scanner()
-            
-            # Try to connect to scanner
-            if not scanner.connect():
+            # Reuse this orchestrator's scanner connection, connecting on first use
+            scanner = await self._get_scanner()
+            if scanner is None:
                 return ActionResult(
                     success=False,
                     error="Failed to connect to OBD2 scanner",
@@ -697,38 +892,40 @@ RESPOND ONLY WITH VALID JSON."""
             
             # Read DTCs if requested
             if parameters.get("read_dtcs", True):
-                dtc_codes = scanner.get_dtc_codes()
+                dtc_codes = await scanner.run_io(scanner.get_dtc_codes)
                 result_data["dtc_codes"] = dtc_codes
                 
-                # Get descriptions and severity for each code
-                dtc_details = []
-                for code in dtc_codes:
-                    dtc_details.append({
+                # Get descriptions and categories for all codes in one pass each
+                descriptions = get_code_descriptions(dtc_codes)
+                categories = categorize_dtcs(dtc_codes)
+                result_data["dtc_details"] = [
+                    {
                         "code": code,
-                        "description": get_code_description(code),
+                        "description": description,
                         "severity": get_dtc_severity(code),
-                        "category": categorize_dtc(code)
-                    })
-                result_data["dtc_details"] = dtc_details
+                        "category": category
+                    }
+                    for code, description, category in zip(dtc_codes, descriptions, categories)
+                ]
             
             # Read live data if requested
             if parameters.get("read_live_data", True):
-                live_params = scanner.get_live_parameters("comprehensive")
+                live_params = await scanner.run_io(scanner.get_live_parameters, "comprehensive")
                 result_data["live_parameters"] = live_params
                 
                 # Get VIN if available
-                vin = scanner.get_vin_from_obd2()
+                vin = await scanner.run_io(scanner.get_vin_from_obd2)
                 if vin:
                     result_data["vin"] = vin
             
-            scanner.disconnect()
-            
             return ActionResult(
                 success=True,
                 data=result_data
             )
             
         except Exception as e:
+            # Drop a connection that may be in a bad state; the next read reconnects
+            await self._close_scanner()
             return ActionResult(
                 success=False,
                 error=f"OBD2 read failed: {str(e)}",
@@ -745,24 +942,10 @@ RESPOND ONLY WITH VALID JSON."""
             vehicle_snapshot = self.state_manager.get_vehicle_snapshot()
             if vehicle_snapshot and vehicle_snapshot.vin:
                 # Use VIN to get detailed vehicle specifications
-                nhtsa_url = f"https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVinValuesExtended/{vehicle_snapshot.vin}?format=json"
-                
                 try:
-                    response = requests.get(nhtsa_url, timeout=10)
-                    if response.status_code == 200:
-                        vin_data = response.json()["Results"][0]
-                        
-                        result_data["vehicle_specifications"] = {
-                            "make": vin_data.get("Make", "Unknown"),
-                            "model": vin_data.get("Model", "Unknown"),
-                            "year": vin_data.get("ModelYear", "Unknown"),
-                            "engine": vin_data.get("EngineModel", "Unknown"),
-                            "displacement": vin_data.get("DisplacementL", "Unknown"),
-                            "fuel_type": vin_data.get("FuelTypePrimary", "Unknown"),
-                            "transmission": vin_data.get("TransmissionStyle", "Unknown"),
-                            "drive_type": vin_data.get("DriveType", "Unknown"),
-                            "vehicle_class": vin_data.get("VehicleType", "Unknown")
-                        }
+                    vehicle_specifications = await asyncio.to_thread(_decode_vin, vehicle_snapshot.vin)
+                    # Copy so the cached decode is never mutated downstream
+                    result_data["vehicle_specifications"] = dict(vehicle_specifications)
                 except Exception as e:
                     logger.warning(f"NHTSA lookup failed: {e}")
             
@@ -818,21 +1001,24 @@ Provide structured information including:
 
 Focus on practical, actionable diagnostic information."""
             
-            response = requests.post(
-                "https://api.together.xyz/v1/chat/completions",
+            # Run the blocking request off the event loop
+            response = await asyncio.to_thread(
+                _SESSION.post,
+                TOGETHER_URL,
                 headers={
                     "Authorization": f"Bearer {self.together_api_key}",
                     "Content-Type": "application/json"
                 },
                 json={
-                    "model": "mistralai/Mistral-7B-Instruct-v0.1",
+                    "model": TOGETHER_MODEL,
                     "messages": [
                         {"role": "system", "content": "You are an expert automotive diagnostic technician with comprehensive knowledge of vehicle repair and troubleshooting."},
                         {"role": "user", "content": search_prompt}
                     ],
                     "temperature": 0.2,
                     "max_tokens": 1000
-                }
+                },
+                timeout=TOGETHER_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -1,4 +1,5 @@
 import os
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -23,13 +24,19 @@ DATABASE_URL = os.getenv(
 
 print(f"🔍 Using DATABASE_URL: {DATABASE_URL}")
 
+def _json_serializer(value) -> str:
+    """Encode JSON columns with orjson (non-string keys are stringified like the stdlib encoder)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
 # Create engine with connection pooling
 engine = create_engine(
     DATABASE_URL,
     pool_size=10,
     max_overflow=20,
     pool_pre_ping=True,  # Verify connections before use
-    echo=os.getenv("ENVIRONMENT") == "development"  # Log SQL in dev
+    echo=os.getenv("ENVIRONMENT") == "development",  # Log SQL in dev
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads
 )
 
 # Create SessionLocal class